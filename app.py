@@ -1,23 +1,34 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import openai
-from openai import OpenAI
-import requests
 from PIL import Image
 from io import BytesIO
 import os
 from dotenv import load_dotenv
-import json
-import time
 import datetime
 import pandas as pd
 import io
 import base64
-import random
 
 # .env 파일에서 환경 변수 로드
+# 아래 모듈들은 가져올 때 설정을 환경 변수에서 읽으므로 그보다 먼저 로드해야 함
 load_dotenv()
 
+from http_client import get_http_client
+from fashion_info import (
+    REQUIRED_TERM_KEYS, write_fashion_trend_info, iter_fashion_term_info, report_term_info_error, get_llm_cache
+)
+from singleflight import get_single_flight
+from pending_render import render_pending
+from session_memo import get_search_memo, set_search_memo
+from image_proxy import get_thumbnails, get_image_proxy, sized_thumbnail
+from image_pager import PAGE_SIZE, get_image_pager, load_more_images
+from cache_warmer import start_cache_warmer, get_cache_warmer
+from query_stats import record_search, get_query_tracker
+from image_search import (
+    iter_image_search, start_image_search, finish_image_search, get_image_search_engine, get_default_image_api_keys
+)
+
 # 페이지 설정
 st.set_page_config(
     page_title="FASHION TREND-SETTER",
@@ -27,14 +38,18 @@ st.set_page_config(
 )
 
 # 세션 상태 초기화
+default_image_api_keys = get_default_image_api_keys()  # 기본 API 키 설정
 if 'openai_api_key' not in st.session_state:
     st.session_state.openai_api_key = os.getenv("OPENAI_API_KEY", "")
 if 'unsplash_api_key' not in st.session_state:
-    st.session_state.unsplash_api_key = os.getenv("UNSPLASH_ACCESS_KEY", "q1VeVvIyw9Y0LS56SrB2yLNWXiSPPFiQdtHe5juBBIk")  # 기본 API 키 설정
+    st.session_state.unsplash_api_key = default_image_api_keys["Unsplash"]
 if 'pexels_api_key' not in st.session_state:
-    st.session_state.pexels_api_key = os.getenv("PEXELS_API_KEY", "hTqMbvksjh4KQvzmBaQEAOEL19izMvDu5PSZpZTRCmRKNPx45WTwAFPq")  # 기본 API 키 설정
+    st.session_state.pexels_api_key = default_image_api_keys["Pexels"]
 if 'pixabay_api_key' not in st.session_state:
-    st.session_state.pixabay_api_key = os.getenv("PIXABAY_API_KEY", "39694943-82b226c530c5db8be85fa7918")  # 기본 API 키 설정
+    st.session_state.pixabay_api_key = default_image_api_keys["Pixabay"]
+
+# 자주 찾는 검색어의 캐시를 백그라운드에서 미리 채움 (프로세스에서 한 번만 시작)
+start_cache_warmer()
 
 # CSS 스타일 적용
 st.markdown("""
@@ -256,6 +271,20 @@ st.markdown("""
         margin: 0 0 5px 2px;
     }
 
+    /* 이미지가 도착하기 전에 자리를 잡아두는 회색 상자 */
+    .image-skeleton {
+        width: 100%;
+        aspect-ratio: 2 / 3;
+        border-radius: 4px;
+        background: linear-gradient(90deg, #eeeeee 25%, #f7f7f7 50%, #eeeeee 75%);
+        background-size: 200% 100%;
+        animation: skeleton-shimmer 1.2s ease-in-out infinite;
+    }
+    @keyframes skeleton-shimmer {
+        from { background-position: 200% 0; }
+        to { background-position: -200% 0; }
+    }
+
     /* 네비게이션 버튼 스타일 */
     .nav-button {
         position: absolute;
@@ -351,6 +380,65 @@ with st.sidebar:
             st.session_state.pixabay_api_key = pixabay_key
             st.success("API 키가 저장되었습니다.")
     
+    # 성능 지표 (프로세스 전체 공유)
+    with st.expander("성능 지표"):
+        st.markdown("**HTTP 연결 재사용**")
+        http_stats = get_http_client().stats()
+        if http_stats:
+            for host, stats in http_stats.items():
+                st.caption(f"{host}: 요청 {stats['requests']}회 / 새 연결 {stats['connections']}회 / 재사용 {stats['reused']}회")
+        else:
+            st.caption("아직 외부 요청이 없습니다.")
+        
+        st.markdown("**이미지 검색 캐시**")
+        cache_stats = get_image_search_engine().cache.stats()
+        st.caption(f"항목 {cache_stats['entries']}개 / {cache_stats['bytes'] / 1024:.1f}KB / 적중 {cache_stats['hits']}회 / 실패 {cache_stats['misses']}회")
+        
+        st.markdown("**LLM 응답 캐시**")
+        llm_stats = get_llm_cache().stats()
+        st.caption(f"적중 {llm_stats['hits']}회 / 오래된 응답 {llm_stats['stale_hits']}회 / 실패 {llm_stats['misses']}회 / 백그라운드 갱신 {llm_stats['refreshes']}회")
+        
+        st.markdown("**제공자 할당량**")
+        for provider, limit_stats in get_image_search_engine().limiter.stats().items():
+            st.caption(f"{provider}: 남은 요청 {limit_stats['available']}/{limit_stats['capacity']} (키 {limit_stats['keys']}개) / 보내지 않은 요청 {limit_stats['shed']}회")
+        
+        st.markdown("**제공자 상태**")
+        state_labels = {"closed": "정상", "open": "차단", "half_open": "시험 중"}
+        for provider, health_stats in get_image_search_engine().health.stats().items():
+            latency = health_stats['ewma_latency']
+            latency_text = f"{latency * 1000:.0f}ms" if latency is not None else "-"
+            p90 = health_stats['p90_latency']
+            p90_text = f"{p90 * 1000:.0f}ms" if p90 is not None else "-"
+            st.caption(f"{provider}: {state_labels[health_stats['state']]} / 오류율 {health_stats['error_rate']:.0%} / 평균 응답 {latency_text} / p90 {p90_text}")
+        st.caption(f"예비 요청(hedging) {get_image_search_engine().hedge_stats()['hedged']}회")
+        hash_stats = get_image_search_engine().hasher.stats()
+        st.caption(f"중복 사진 제외 {hash_stats['duplicates']}장 / 해시 계산 {hash_stats['computed']}회 / 저장된 해시 {hash_stats['cache_hits']}회")
+        
+        st.markdown("**썸네일**")
+        thumb_stats = get_image_proxy().stats()
+        st.caption(f"생성 {thumb_stats['generated']}개 / 재사용 {thumb_stats['hits']}회 / 실패 {thumb_stats['failures']}회 / 절약 {thumb_stats['bytes_saved'] / 1024 / 1024:.1f}MB")
+        
+        st.markdown("**캐시 미리 채우기**")
+        warm_stats = get_cache_warmer().stats()
+        st.caption(f"갱신 {warm_stats['refreshed']}회 / 최신 상태 {warm_stats['fresh']}회 / 실패 {warm_stats['failures']}회 / 확인 {warm_stats['rounds']}바퀴")
+        
+        st.markdown("**인기 검색어**")
+        query_tracker = get_query_tracker()
+        for page_key, page_label in [("trend_info", "트렌드"), ("brands", "브랜드"), ("styling", "스타일링")]:
+            top_queries = query_tracker.top_queries(page_key, 3)
+            top_text = ", ".join(f"{query} ({count:.1f})" for _, query, count in top_queries) or "-"
+            st.caption(f"{page_label}: {top_text}")
+        st.caption(f"이번 실행 검색 {query_tracker.stats()['searches']}회 / 추적 중인 검색어 {query_tracker.stats()['tracked']}개")
+        
+        st.markdown("**검색어 번역**")
+        translation_stats = get_image_search_engine().translator.stats()
+        st.caption(f"용어집 {translation_stats['glossary_hits']}회 / 저장된 번역 {translation_stats['cache_hits']}회 / LLM 번역 {translation_stats['llm_calls']}회 / 실패 {translation_stats['failures']}회")
+        
+        st.markdown("**동시 요청 합치기**")
+        for flight_name, flight_label in [("llm", "LLM"), ("image_search", "이미지 검색")]:
+            flight_stats = get_single_flight(flight_name).stats()
+            st.caption(f"{flight_label}: 실제 호출 {flight_stats['calls']}회 / 합쳐진 요청 {flight_stats['coalesced']}회 / 진행 중 {flight_stats['in_flight']}건")
+    
     # 푸터 정보 (사이드바 하단)
     st.markdown("<div class='sidebar-footer'>", unsafe_allow_html=True)
     st.markdown("<div class='footer-small'>### FASHION TREND-SETTER 앱 정보</div>", unsafe_allow_html=True)
@@ -462,6 +550,10 @@ def display_trend_news():
         with news_cols[1]:
             cards_cols = st.columns(4)
             end_idx = min(st.session_state.news_index + 4, len(fashion_news))
+            # 카드 크기에 맞춘 썸네일 (한 번에 준비)
+            news_images = get_thumbnails(
+                [news['image'] for news in fashion_news[st.session_state.news_index:end_idx]], NEWS_CARD_WIDTH
+            )
             
             for i, col in enumerate(cards_cols):
                 idx = st.session_state.news_index + i
@@ -470,7 +562,7 @@ def display_trend_news():
                     with col:
                         st.markdown(f"""
                         <div class="news-card">
-                            <img src="{news['image']}" alt="{news['title']}">
+                            <img src="{news_images[i][0]}" srcset="{news_images[i][1]}" alt="{news['title']}" loading="lazy">
                             <div class="news-content">
                                 <div class="news-category">{news['category']}</div>
                                 <div class="news-title">{news['title']}</div>
@@ -489,6 +581,172 @@ def display_trend_news():
                     st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
 
+# 화면에 실제로 표시되는 이미지 너비 (px) - 원본 대신 이 너비로 줄인 썸네일을 사용
+NEWS_CARD_WIDTH = 320
+IMAGE_COLUMN_WIDTH = 380
+BRAND_IMAGE_WIDTH = 576
+
+
+# 썸네일 (src, srcset)과 출처 표시 (로컬 썸네일 주소는 st.image가 파일 경로로 처리하므로 <img> 태그 사용)
+def show_image(thumbnail, caption):
+    src, srcset = thumbnail
+    st.markdown(f"<img src='{src}' srcset='{srcset}' style='width: 100%; border-radius: 4px;' loading='lazy'>", unsafe_allow_html=True)
+    st.caption(caption)
+
+
+# 이미지 검색 실패 시 사용할 기본 이미지
+TREND_DEFAULT_IMAGES = [
+    "https://images.unsplash.com/photo-1492707892479-7bc8d5a4ee93?w=600",
+    "https://images.unsplash.com/photo-1490481651871-ab68de25d43d?w=600",
+    "https://images.unsplash.com/photo-1445205170230-053b83016050?w=600"
+]
+BRAND_DEFAULT_IMAGE = "https://images.unsplash.com/photo-1441984904996-e0b6ba687e04?w=600"
+
+
+# 트렌드 페이지 관련 이미지 그리기
+def show_trend_images(images, sources):
+    # 이미지 표시
+    cols = st.columns(3)
+    thumbnails = get_thumbnails(images, IMAGE_COLUMN_WIDTH)
+    for i, (thumbnail, source) in enumerate(zip(thumbnails, sources)):
+        with cols[i]:
+            show_image(thumbnail, f"출처: {source}")
+    
+    # 이미지 출처 정보
+    unique_sources = set(sources)
+    source_text = ", ".join(unique_sources)
+    st.markdown(f"""
+    <div class='footer-tiny' style='text-align: center; margin-top: 10px;'>
+    이미지 제공: {source_text}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# 트렌드 페이지 관련 이미지 표시 (백그라운드 검색이 끝나면 호출) - 표시한 (이미지, 출처) 반환
+def render_trend_images(slot, image_future):
+    with slot.container():
+        try:
+            # 다중 이미지 소스에서 검색한 결과
+            images, sources = finish_image_search(image_future)
+        except Exception as e:
+            # 에러 발생 시 기본 이미지 표시
+            st.error(f"이미지 검색 중 오류 발생: {e}")
+            images, sources = TREND_DEFAULT_IMAGES, ["Unsplash"] * len(TREND_DEFAULT_IMAGES)
+        show_trend_images(images, sources)
+    return images, sources
+
+
+# 브랜드 페이지 이미지 그리기
+def show_brand_image(image, source):
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    show_image(get_image_proxy().thumbnail(image, BRAND_IMAGE_WIDTH), f"출처: {source}")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+# 브랜드 페이지 이미지 표시 (백그라운드 검색이 끝나면 호출) - 표시한 (이미지, 출처) 반환
+def render_brand_image(slot, image_future):
+    with slot.container():
+        try:
+            # 브랜드 특화 검색어로 찾은 1개 이미지
+            brand_images, brand_sources = finish_image_search(image_future)
+            image, source = brand_images[0], brand_sources[0]
+        except Exception as e:
+            # 오류 발생 시 기본 이미지 표시
+            st.error(f"이미지 검색 중 오류 발생: {e}")
+            image, source = BRAND_DEFAULT_IMAGE, "Unsplash"
+        show_brand_image(image, source)
+    return image, source
+
+
+# 스타일링 검색 결과 자리 만들기 - 3개씩 한 행에 회색 상자를 먼저 그려두고 자리(st.empty) 목록 반환
+def create_styling_slots(count):
+    slots = []
+    for i in range(0, count, 3):
+        cols = st.columns(3)
+        for j in range(min(3, count - i)):
+            with cols[j]:
+                slot = st.empty()
+                slot.markdown("<div class='image-skeleton'></div>", unsafe_allow_html=True)
+                slots.append(slot)
+    return slots
+
+
+# 바뀐 자리만 새 이미지로 다시 그림 - shown: 자리마다 지금 그려진 (이미지 주소, 썸네일 여부) (갱신됨)
+# proxied가 False면 썸네일을 만들지 않고 제공자에서 크기를 맞춘 주소로 바로 그림 (검색 중간 결과용)
+def fill_styling_slots(slots, shown, images, sources, proxied=True):
+    changed = [i for i in range(min(len(slots), len(images))) if shown[i] != (images[i], proxied)]
+    urls = [images[i] for i in changed]
+    thumbnails = get_thumbnails(urls, IMAGE_COLUMN_WIDTH) if proxied else [sized_thumbnail(url, IMAGE_COLUMN_WIDTH) for url in urls]
+    for i, thumbnail in zip(changed, thumbnails):
+        with slots[i].container():
+            show_image(thumbnail, f"출처: {sources[i]}")
+        shown[i] = (images[i], proxied)
+
+
+# 이미지 출처 정보
+def show_image_sources(sources):
+    unique_sources = set(sources)
+    source_text = ", ".join(unique_sources)
+    st.markdown(f"""
+    <div class='footer-tiny' style='text-align: center; margin-top: 20px;'>
+    이미지 제공: {source_text}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# 스타일링 검색 결과 그리기
+def show_styling_images(style_query, images, sources):
+    st.markdown(f"### '{style_query}'")
+    
+    # 이미지를 3개씩 한 행에 표시
+    slots = create_styling_slots(len(images))
+    fill_styling_slots(slots, [None] * len(slots), images, sources)
+    show_image_sources(sources)
+
+
+# 스타일링 검색 결과를 제공자 응답이 도착하는 대로 표시 - 최종 (이미지, 출처) 반환
+# 회색 상자를 먼저 그리고 중간 결과마다 바뀐 자리만 채운 뒤, 마지막에 기본 이미지까지 채운 결과로 마무리
+def render_styling_images(style_query, count=PAGE_SIZE):
+    st.markdown(f"### '{style_query}'")
+    slots = create_styling_slots(count)
+    shown = [None] * count
+    images, sources = [], []
+    for images, sources, done in iter_image_search(style_query, count):
+        # 중간 결과는 제공자 주소로 바로 그리고, 마지막 결과에서 로컬 썸네일로 바꿈
+        fill_styling_slots(slots, shown, images, sources, proxied=done)
+    for slot in slots[len(images):]:
+        slot.empty()
+    if images:
+        show_image_sources(sources)
+    return images, sources
+
+
+# 브랜드 정보 카드 표시 (필드가 도착하는 대로 해당 자리에 그림)
+def render_brand_field(slot, brand_name, key, value, complete=True):
+    with slot.container():
+        if key == "definition":
+            # 작성 중인 정의는 커서와 함께 표시
+            text = value if complete else f"{value}▌"
+            st.markdown(f"<div class='card'><h2>{brand_name}</h2>", unsafe_allow_html=True)
+            st.markdown(f"<p>{text}</p></div>", unsafe_allow_html=True)
+        elif key == "examples":
+            st.markdown("<div class='card'><h3>대표 제품/스타일</h3>", unsafe_allow_html=True)
+            for example in value:
+                st.markdown(f"- {example}")
+            st.markdown("</div>", unsafe_allow_html=True)
+        elif key == "brands":
+            st.markdown("<div class='card'><h3>관련 브랜드</h3>", unsafe_allow_html=True)
+            for brand in value:
+                st.markdown(f"- {brand}")
+            st.markdown("</div>", unsafe_allow_html=True)
+        elif key == "related_terms":
+            st.markdown("<div class='card'><h3>관련 용어</h3>", unsafe_allow_html=True)
+            term_html = ""
+            for term in value:
+                term_html += f"<span class='related-keyword'>{term}</span>"
+            st.markdown(term_html, unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+
 # 타이틀
 st.title("FASHION TREND-SETTER")
 
@@ -594,226 +852,122 @@ else:
         st.markdown("### 패션 트렌드/용어")
         search_query = st.text_input("", placeholder="(예: Y2K 패션, 아방가르드, 하이엔드 등)", key="trend_search")
         
-        # GPT를 통한 트렌드 정보 검색
-        def get_fashion_trend_info(query):
-            try:
-                if not st.session_state.openai_api_key:
-                    st.error("OpenAI API 키를 입력해주세요. 사이드바의 'API 키 설정'에서 입력할 수 있습니다.")
-                    return None
-                
-                client = OpenAI(api_key=st.session_state.openai_api_key)
-                
-                # 최대 3번 시도
-                max_attempts = 3
-                for attempt in range(max_attempts):
-                    try:
-                        response = client.chat.completions.create(
-                            model="gpt-3.5-turbo",
-                            messages=[
-                                {"role": "system", "content": "당신은 패션 용어와 트렌드에 대한 설명을 제공하는 패션 전문가입니다. 사용자가 입력한 패션 용어나 트렌드에 대해 자세히 설명해주세요."},
-                                {"role": "user", "content": f"다음 패션 용어/트렌드의 의미와 특징을 알려주세요: {query}"}
-                            ],
-                            temperature=0.7,
-                            max_tokens=500
-                        )
-                        
-                        content = response.choices[0].message.content
-                        if content and len(content.strip()) > 0:
-                            return {"description": content.strip()}
-                        else:
-                            if attempt < max_attempts - 1:
-                                time.sleep(1)  # 잠시 대기 후 재시도
-                                continue
-                            else:
-                                st.error("API에서 빈 응답을 받았습니다. 다른 검색어로 시도해 보세요.")
-                                return None
-                    except Exception as e:
-                        if attempt < max_attempts - 1:
-                            time.sleep(1)  # 잠시 대기 후 재시도
-                            continue
-                        else:
-                            raise e
-                
-                return None
-            except Exception as e:
-                st.error(f"OpenAI API 호출 중 오류 발생: {e}")
-                return None
-
         # 검색 실행
         if search_query:
             if not st.session_state.openai_api_key:
                 st.error("OpenAI API 키를 입력해주세요. 사이드바의 'API 키 설정'에서 입력할 수 있습니다.")
+            elif get_search_memo("trend_info", search_query):
+                # 같은 검색어로 다시 실행된 경우 저장된 결과로 다시 그림
+                memo = get_search_memo("trend_info", search_query)
+                st.markdown(f"### '{search_query}'")
+                st.write(memo["description"])
+                st.markdown("---")
+                st.markdown("### 관련 이미지")
+                show_trend_images(memo["images"], memo["sources"])
             else:
-                with st.spinner("정보를 검색 중입니다..."):
-                    try:
-                        # 트렌드/용어 정보 가져오기
-                        trend_info = get_fashion_trend_info(search_query)
-                        if trend_info and "description" in trend_info:
-                            # 설명 표시 ('에 대한 설명' 문구 제거)
-                            st.markdown(f"### '{search_query}'")
-                            st.write(trend_info["description"])
-                            
-                            # 구분선 추가
-                            st.markdown("---")
-                            
-                            # 이미지 표시
-                            st.markdown("### 관련 이미지")
-                            
-                            try:
-                                # 다중 이미지 소스에서 검색
-                                images, sources = search_images_from_multiple_sources(search_query, count=3)
-                                
-                                # 이미지 표시
-                                cols = st.columns(3)
-                                for i, (img_url, source) in enumerate(zip(images, sources)):
-                                    with cols[i]:
-                                        st.image(img_url, caption=f"출처: {source}", use_container_width=True)
-                                
-                                # 이미지 출처 정보
-                                unique_sources = set(sources)
-                                source_text = ", ".join(unique_sources)
-                                st.markdown(f"""
-                                <div class='footer-tiny' style='text-align: center; margin-top: 10px;'>
-                                이미지 제공: {source_text}
-                                </div>
-                                """, unsafe_allow_html=True)
-                            except Exception as e:
-                                # 에러 발생 시 기본 이미지 표시
-                                st.error(f"이미지 검색 중 오류 발생: {e}")
-                                default_images = [
-                                    "https://images.unsplash.com/photo-1492707892479-7bc8d5a4ee93?w=600",
-                                    "https://images.unsplash.com/photo-1490481651871-ab68de25d43d?w=600",
-                                    "https://images.unsplash.com/photo-1445205170230-053b83016050?w=600"
-                                ]
-                                cols = st.columns(3)
-                                for i, img_url in enumerate(default_images):
-                                    with cols[i]:
-                                        st.image(img_url, caption="출처: Unsplash", use_container_width=True)
-                        else:
+                try:
+                    # 인기 검색어 집계
+                    record_search("trend_info", search_query)
+                    
+                    # 이미지 검색은 설명 생성과 동시에 백그라운드에서 시작
+                    image_future = start_image_search(search_query, count=3)
+                    
+                    # 섹션 자리를 미리 만들고 준비되는 대로 채움
+                    st.markdown(f"### '{search_query}'")
+                    description_container = st.container()
+                    
+                    # 구분선 추가
+                    st.markdown("---")
+                    
+                    # 이미지 표시
+                    st.markdown("### 관련 이미지")
+                    image_slot = st.empty()
+                    image_slot.caption("관련 이미지를 검색 중입니다...")
+                    shown_images = []
+                    
+                    # 이미지 검색이 끝나면 설명을 기다리는 중이라도 바로 표시
+                    pending = {image_future: lambda: shown_images.append(render_trend_images(image_slot, image_future))}
+                    
+                    # 트렌드/용어 정보 표시 ('에 대한 설명' 문구 제거) - 스트리밍 모드에서는 도착하는 대로 표시
+                    with description_container:
+                        trend_info = write_fashion_trend_info(search_query, pending)
+                        if not (trend_info and "description" in trend_info):
                             st.error("검색 결과를 가져오지 못했습니다. 다른 검색어로 시도해 보세요.")
-                    except Exception as e:
-                        st.error(f"검색 중 오류 발생: {e}")
-                        st.error("잠시 후 다시 시도해 주세요.")
+                    
+                    render_pending(pending)
+                    
+                    # 설명을 받은 경우에만 결과 기억 (실패하면 다음 실행 때 다시 시도)
+                    if trend_info and "description" in trend_info:
+                        images, sources = shown_images[0]
+                        set_search_memo("trend_info", search_query, {
+                            "description": trend_info["description"], "images": images, "sources": sources
+                        })
+                except Exception as e:
+                    st.error(f"검색 중 오류 발생: {e}")
+                    st.error("잠시 후 다시 시도해 주세요.")
 
     elif st.session_state.page == "brands":
         st.markdown("### 패션 브랜드 알아보기")
         search_query = st.text_input("", placeholder="브랜드명을 입력하세요 (예: 구찌, 프라다, 나이키 등)", key="brand_search")
         
-        # 패션 용어/브랜드 정보 검색
-        def get_fashion_term_info(query):
-            try:
-                # API 키 확인
-                if not st.session_state.openai_api_key:
-                    st.error("OpenAI API 키를 입력해주세요. 사이드바의 'API 설정'에서 입력할 수 있습니다.")
-                    return None
-                
-                # OpenAI 클라이언트 초기화
-                client = OpenAI(api_key=st.session_state.openai_api_key)
-                
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "당신은 패션 전문가입니다. 패션 용어와 브랜드에 대한 상세한 정보를 제공해주세요. 응답은 반드시 유효한 JSON 형식이어야 합니다."},
-                        {"role": "user", "content": f"다음 패션 용어 또는 브랜드에 대해 알려주세요: {query}. 다음 JSON 형식으로만 응답해주세요(추가 텍스트 없이): {{\"definition\": \"정의\", \"examples\": [\"예시1\", \"예시2\"], \"brands\": [\"브랜드1\", \"브랜드2\"], \"related_terms\": [\"관련용어1\", \"관련용어2\"]}}"}
-                    ],
-                    response_format={"type": "json_object"}
-                )
-                return response.choices[0].message.content
-            except Exception as e:
-                st.error(f"OpenAI API 호출 중 오류 발생: {e}")
-                return None
-
         if search_query:
             # API 키 확인
             if not st.session_state.openai_api_key:
                 st.error("OpenAI API 키를 입력해주세요. 사이드바의 'API 키 설정'에서 입력할 수 있습니다.")
+            elif get_search_memo("brands", search_query):
+                # 같은 검색어로 다시 실행된 경우 저장된 결과로 다시 그림
+                memo = get_search_memo("brands", search_query)
+                col1, col2 = st.columns([1, 1])
+                with col1:
+                    for key in REQUIRED_TERM_KEYS:
+                        render_brand_field(st.empty(), search_query, key, memo["brand_info"][key])
+                with col2:
+                    show_brand_image(memo["image"], memo["source"])
             else:
-                with st.spinner("브랜드 정보를 검색 중입니다..."):
-                    try:
-                        # 브랜드 이름 정리
-                        brand_name = search_query
-                        
-                        # 브랜드 정보 가져오기
-                        brand_info_str = get_fashion_term_info(brand_name)
-                        if brand_info_str:
-                            try:
-                                brand_info = json.loads(brand_info_str)
-                                
-                                # 필수 키가 있는지 확인
-                                required_keys = ["definition", "examples", "brands", "related_terms"]
-                                for key in required_keys:
-                                    if key not in brand_info:
-                                        st.error(f"API 응답에 필요한 '{key}' 정보가 없습니다. 다시 시도해 주세요.")
-                                        raise KeyError(f"Missing required key: {key}")
-                                
-                                # 이미지 URL 가져오기 - 브랜드 특화 검색어 사용
-                                try:
-                                    # 브랜드 이미지 검색 - 브랜드 특화 검색어로 1개 이미지 검색
-                                    brand_images, brand_sources = search_images_from_multiple_sources(f"{brand_name} fashion brand", count=1)
-                                    
-                                    # 브랜드 정보 표시
-                                    col1, col2 = st.columns([1, 1])
-                                    
-                                    with col1:
-                                        st.markdown(f"<div class='card'><h2>{brand_name}</h2>", unsafe_allow_html=True)
-                                        st.markdown(f"<p>{brand_info['definition']}</p></div>", unsafe_allow_html=True)
-                                        
-                                        st.markdown("<div class='card'><h3>대표 제품/스타일</h3>", unsafe_allow_html=True)
-                                        for example in brand_info['examples']:
-                                            st.markdown(f"- {example}")
-                                        st.markdown("</div>", unsafe_allow_html=True)
-                                        
-                                        st.markdown("<div class='card'><h3>관련 용어</h3>", unsafe_allow_html=True)
-                                        term_html = ""
-                                        for term in brand_info['related_terms']:
-                                            term_html += f"<span class='related-keyword'>{term}</span>"
-                                        st.markdown(term_html, unsafe_allow_html=True)
-                                        st.markdown("</div>", unsafe_allow_html=True)
-                                    
-                                    with col2:
-                                        st.markdown("<div class='card'>", unsafe_allow_html=True)
-                                        st.image(brand_images[0], caption=f"출처: {brand_sources[0]}", use_container_width=True)
-                                        st.markdown("</div>", unsafe_allow_html=True)
-                                    
-                                except Exception as e:
-                                    # 오류 발생 시 기본 정보만 표시
-                                    st.error(f"이미지 검색 중 오류 발생: {e}")
-                                    
-                                    # 기본 이미지
-                                    default_image = "https://images.unsplash.com/photo-1441984904996-e0b6ba687e04?w=600"
-                                    
-                                    # 브랜드 정보 표시
-                                    col1, col2 = st.columns([1, 1])
-                                    
-                                    with col1:
-                                        st.markdown(f"<div class='card'><h2>{brand_name}</h2>", unsafe_allow_html=True)
-                                        st.markdown(f"<p>{brand_info['definition']}</p></div>", unsafe_allow_html=True)
-                                        
-                                        st.markdown("<div class='card'><h3>대표 제품/스타일</h3>", unsafe_allow_html=True)
-                                        for example in brand_info['examples']:
-                                            st.markdown(f"- {example}")
-                                        st.markdown("</div>", unsafe_allow_html=True)
-                                        
-                                        st.markdown("<div class='card'><h3>관련 용어</h3>", unsafe_allow_html=True)
-                                        term_html = ""
-                                        for term in brand_info['related_terms']:
-                                            term_html += f"<span class='related-keyword'>{term}</span>"
-                                        st.markdown(term_html, unsafe_allow_html=True)
-                                        st.markdown("</div>", unsafe_allow_html=True)
-                                    
-                                    with col2:
-                                        st.markdown("<div class='card'>", unsafe_allow_html=True)
-                                        st.image(default_image, caption="출처: Unsplash", use_container_width=True)
-                                        st.markdown("</div>", unsafe_allow_html=True)
-                            except json.JSONDecodeError as e:
-                                st.error(f"JSON 파싱 오류: {e}")
-                                st.error("API 응답이 올바른 JSON 형식이 아닙니다. 다시 시도해 주세요.")
-                            except KeyError as e:
-                                st.error(f"필수 데이터 누락: {e}")
+                try:
+                    # 브랜드 이름 정리
+                    brand_name = search_query
+                    
+                    # 인기 검색어 집계
+                    record_search("brands", brand_name)
+                    
+                    # 브랜드 이미지 검색은 브랜드 정보 생성과 동시에 백그라운드에서 시작 (브랜드 특화 검색어로 1개)
+                    image_future = start_image_search(f"{brand_name} fashion brand", count=1)
                     
+                    # 브랜드 정보 표시 자리 - 필드가 완성되는 대로 채움
+                    col1, col2 = st.columns([1, 1])
+                    with col1:
+                        field_slots = {key: st.empty() for key in REQUIRED_TERM_KEYS}
+                    with col2:
+                        image_slot = st.empty()
+                    field_slots["definition"].caption("브랜드 정보를 검색 중입니다...")
+                    shown_images = []
+                    
+                    # 이미지 검색이 끝나면 브랜드 정보를 기다리는 중이라도 바로 표시
+                    pending = {image_future: lambda: shown_images.append(render_brand_image(image_slot, image_future))}
+                    
+                    # 브랜드 정보 가져오기
+                    brand_info = {}
+                    try:
+                        for key, value, complete in iter_fashion_term_info(brand_name, pending):
+                            render_brand_field(field_slots[key], brand_name, key, value, complete)
+                            if complete:
+                                brand_info[key] = value
                     except Exception as e:
-                        st.error(f"오류 발생: {e}")
-                        st.error("브랜드 정보를 처리하는 중 문제가 발생했습니다. 다시 시도해 주세요.")
+                        field_slots["definition"].empty()
+                        report_term_info_error(e)
+                        brand_info = None
+                    
+                    render_pending(pending)
+                    
+                    # 브랜드 정보를 모두 받은 경우에만 결과 기억
+                    if brand_info:
+                        image, source = shown_images[0]
+                        set_search_memo("brands", search_query, {"brand_info": brand_info, "image": image, "source": source})
+                
+                except Exception as e:
+                    st.error(f"오류 발생: {e}")
+                    st.error("브랜드 정보를 처리하는 중 문제가 발생했습니다. 다시 시도해 주세요.")
 
     elif st.session_state.page == "styling":
         st.markdown("### 스타일링 검색")
@@ -821,38 +975,40 @@ else:
         
         style_query = st.text_input("", placeholder="검색어를 입력하세요 (예: 미니멀 스타일링, 블루 코트, 캐주얼 룩 등)", key="style_search")
         
-        if style_query:
-            with st.spinner("스타일링 이미지를 검색 중입니다..."):
-                try:
-                    # 다중 이미지 소스에서 이미지 검색
-                    images, sources = search_images_from_multiple_sources(style_query)
-                    
-                    # 결과 표시
-                    if images:
-                        st.markdown(f"### '{style_query}'")
-                        
-                        # 이미지를 3개씩 2행으로 표시
-                        for i in range(0, len(images), 3):
-                            cols = st.columns(3)
-                            for j in range(3):
-                                if i+j < len(images):
-                                    with cols[j]:
-                                        st.image(images[i+j], use_container_width=True)
-                                        st.caption(f"출처: {sources[i+j]}")
-                        
-                        # 이미지 출처 정보
-                        unique_sources = set(sources)
-                        source_text = ", ".join(unique_sources)
-                        st.markdown(f"""
-                        <div class='footer-tiny' style='text-align: center; margin-top: 20px;'>
-                        이미지 제공: {source_text}
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.error("이미지를 찾을 수 없습니다. 다른 검색어로 시도해 보세요.")
-                except Exception as e:
-                    st.error(f"이미지 검색 중 오류 발생: {e}")
-                    st.error("잠시 후 다시 시도해 주세요.")
+        if style_query and get_search_memo("styling", style_query):
+            # 같은 검색어로 다시 실행된 경우 저장된 결과로 다시 그림
+            memo = get_search_memo("styling", style_query)
+            show_styling_images(style_query, memo["images"], memo["sources"])
+        elif style_query:
+            try:
+                # 인기 검색어 집계
+                record_search("styling", style_query)
+                
+                # 다중 이미지 소스에서 이미지 검색 - 도착하는 대로 표시
+                images, sources = render_styling_images(style_query)
+                
+                if images:
+                    set_search_memo("styling", style_query, {"images": images, "sources": sources})
+                else:
+                    st.error("이미지를 찾을 수 없습니다. 다른 검색어로 시도해 보세요.")
+            except Exception as e:
+                st.error(f"이미지 검색 중 오류 발생: {e}")
+                st.error("잠시 후 다시 시도해 주세요.")
+        
+        memo = get_search_memo("styling", style_query) if style_query else None
+        if memo:
+            # 보고 있는 동안 다음 페이지를 미리 받아두고, "더 보기"는 받아둔 이미지를 이어서 표시
+            pager = get_image_pager(style_query, memo["images"])
+            if pager.has_more() and st.button("더 보기", key="styling_more", use_container_width=True):
+                with st.spinner("이미지를 더 불러오는 중입니다..."):
+                    more_images, more_sources = load_more_images(pager)
+                if more_images:
+                    set_search_memo("styling", style_query, {
+                        "images": memo["images"] + more_images, "sources": memo["sources"] + more_sources
+                    })
+                    st.rerun()
+                else:
+                    st.info("더 불러올 이미지가 없습니다.")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -863,144 +1019,3 @@ st.markdown("""
 © 2025 FASHION TREND-SETTER. All rights reserved.
 </div>
 """, unsafe_allow_html=True)
-
-# 다중 이미지 소스(Unsplash, Pexels, Pixabay)를 사용하는 이미지 검색 함수
-def search_images_from_multiple_sources(query, count=6):
-    # 결과 이미지 목록과 출처 정보
-    images = []
-    sources = []
-    
-    # 기본 이미지 (API 호출 실패 시 사용)
-    default_images = [
-        "https://images.unsplash.com/photo-1492707892479-7bc8d5a4ee93",
-        "https://images.unsplash.com/photo-1490481651871-ab68de25d43d",
-        "https://images.unsplash.com/photo-1445205170230-053b83016050",
-        "https://images.unsplash.com/photo-1479064555552-3ef4979f8908",
-        "https://images.unsplash.com/photo-1485968579580-b6d095142e6e",
-        "https://images.unsplash.com/photo-1515886657613-9f3515b0c78f",
-        "https://images.unsplash.com/photo-1509631179647-0177331693ae",
-        "https://images.unsplash.com/photo-1566206091558-7f218b696731",
-        "https://images.unsplash.com/photo-1581044777550-4cfa60707c03",
-        "https://images.unsplash.com/photo-1604925529478-b7c844b27290"
-    ]
-    default_sources = ["Unsplash" for _ in range(len(default_images))]
-    
-    # 검색 키워드 준비
-    if any('\u3131' <= c <= '\u318F' or '\uAC00' <= c <= '\uD7A3' for c in query):  # 한글 감지
-        # 한글 키워드인 경우
-        search_keywords = [
-            f"{query} 패션",
-            f"{query} 스타일링",
-            f"{query} 코디",
-            f"{query} 패션 코디",
-            f"{query} 룩",
-            f"{query} 트렌드"
-        ]
-    else:
-        # 영문 키워드인 경우
-        search_keywords = [
-            f"{query} fashion",
-            f"{query} style",
-            f"{query} outfit",
-            f"{query} look",
-            f"{query} styling",
-            f"{query} trend"
-        ]
-    
-    # 1. Unsplash API 호출
-    if st.session_state.unsplash_api_key and len(images) < count:
-        remaining = count - len(images)
-        for keyword in search_keywords:
-            if len(images) >= count:
-                break
-                
-            try:
-                url = f"https://api.unsplash.com/search/photos?query={keyword}&client_id={st.session_state.unsplash_api_key}&per_page={remaining}&orientation=portrait"
-                response = requests.get(url)
-                data = response.json()
-                
-                if 'results' in data and len(data['results']) > 0:
-                    for item in data['results']:
-                        if item['urls']['regular'] not in images:
-                            images.append(item['urls']['regular'])
-                            sources.append("Unsplash")
-                            if len(images) >= count:
-                                break
-            except Exception as e:
-                st.error(f"Unsplash 검색 오류 ({keyword}): {e}")
-                continue
-    
-    # 2. Pexels API 호출
-    if st.session_state.pexels_api_key and len(images) < count:
-        remaining = count - len(images)
-        headers = {"Authorization": st.session_state.pexels_api_key}
-        
-        for keyword in search_keywords:
-            if len(images) >= count:
-                break
-                
-            try:
-                url = f"https://api.pexels.com/v1/search?query={keyword}&per_page={remaining}&orientation=portrait"
-                response = requests.get(url, headers=headers)
-                data = response.json()
-                
-                if 'photos' in data and len(data['photos']) > 0:
-                    for photo in data['photos']:
-                        if photo['src']['large'] not in images:
-                            images.append(photo['src']['large'])
-                            sources.append("Pexels")
-                            if len(images) >= count:
-                                break
-            except Exception as e:
-                st.error(f"Pexels 검색 오류 ({keyword}): {e}")
-                continue
-    
-    # 3. Pixabay API 호출
-    if st.session_state.pixabay_api_key and len(images) < count:
-        remaining = count - len(images)
-        
-        for keyword in search_keywords:
-            if len(images) >= count:
-                break
-                
-            try:
-                url = f"https://pixabay.com/api/?key={st.session_state.pixabay_api_key}&q={keyword}&image_type=photo&per_page={remaining}&orientation=vertical"
-                response = requests.get(url)
-                data = response.json()
-                
-                if 'hits' in data and len(data['hits']) > 0:
-                    for hit in data['hits']:
-                        if hit['webformatURL'] not in images:
-                            images.append(hit['webformatURL'])
-                            sources.append("Pixabay")
-                            if len(images) >= count:
-                                break
-            except Exception as e:
-                st.error(f"Pixabay 검색 오류 ({keyword}): {e}")
-                continue
-    
-    # 결과가 없거나 부족한 경우 기본 이미지로 보충
-    if not images:
-        # 결과가 없으면 기본 이미지와 출처 사용
-        shuffled_indices = list(range(len(default_images)))
-        random.shuffle(shuffled_indices)
-        selected_indices = shuffled_indices[:count]
-        
-        images = [default_images[i] for i in selected_indices]
-        sources = [default_sources[i] for i in selected_indices]
-    elif len(images) < count:
-        # 결과가 부족하면 기본 이미지로 보충
-        remaining = count - len(images)
-        shuffled_indices = list(range(len(default_images)))
-        random.shuffle(shuffled_indices)
-        
-        for i in shuffled_indices:
-            if default_images[i] not in images and remaining > 0:
-                images.append(default_images[i])
-                sources.append(default_sources[i])
-                remaining -= 1
-                
-            if remaining <= 0:
-                break
-    
-    return images, sources 
\ No newline at end of file
@@ -15,6 +15,8 @@ import io
 import base64
 import random
 
+from http_client import get_http_client
+
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
@@ -827,7 +829,7 @@ def get_image_url(query):
         for search_query in search_queries:
             try:
                 url = f"https://api.unsplash.com/search/photos?query={search_query}&client_id={unsplash_access_key}&per_page=5&orientation=landscape"
-                response = requests.get(url)
+                response = get_http_client().get(url)
                 data = response.json()
                 
                 if 'results' in data and len(data['results']) > 0:
@@ -844,7 +846,7 @@ def get_image_url(query):
         # 결과가 없으면 기본 검색 시도
         try:
             url = f"https://api.unsplash.com/search/photos?query=fashion style&client_id={unsplash_access_key}&per_page=5"
-            response = requests.get(url)
+            response = get_http_client().get(url)
             data = response.json()
             
             if 'results' in data and len(data['results']) > 0:
@@ -907,7 +909,7 @@ def get_multiple_images(query, count=6):
         for search_query in search_queries:
             try:
                 url = f"https://api.unsplash.com/search/photos?query={search_query}&client_id={unsplash_access_key}&per_page={count}&orientation=portrait"
-                response = requests.get(url)
+                response = get_http_client().get(url)
                 data = response.json()
                 
                 if 'results' in data and len(data['results']) > 0:
@@ -926,7 +928,7 @@ def get_multiple_images(query, count=6):
             # 결과가 있지만 부족한 경우, 기본 패션 검색으로 보충
             try:
                 url = f"https://api.unsplash.com/search/photos?query=fashion style&client_id={unsplash_access_key}&per_page={count-len(all_images)}"
-                response = requests.get(url)
+                response = get_http_client().get(url)
                 data = response.json()
                 
                 if 'results' in data and len(data['results']) > 0:
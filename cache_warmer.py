@@ -0,0 +1,174 @@
+import os
+import time
+import threading
+import concurrent.futures
+
+import streamlit as st
+
+from fashion_info import (
+    OPENAI_MODEL, TREND_PROMPT_VERSION, TREND_TEMPERATURE, TERM_PROMPT_VERSION, TERM_TEMPERATURE,
+    canonicalize_query, make_llm_cache_key, fetch_fashion_trend_info, fetch_fashion_term_info, get_openai_client, get_llm_cache
+)
+from image_pager import PAGE_SIZE
+from image_search import get_image_search_engine, get_default_image_api_keys
+from query_stats import get_query_tracker
+
+# 자주 찾는 검색어의 LLM/이미지 캐시를 만료 전에 미리 채울지 여부
+CACHE_WARMING = os.getenv("CACHE_WARMING", "1") == "1"
+WARM_INTERVAL = int(os.getenv("CACHE_WARM_INTERVAL", "900"))  # 이 간격(초)마다 검색어 목록을 한 번씩 확인
+WARM_AHEAD = int(os.getenv("CACHE_WARM_AHEAD", "1800"))  # 만료까지 이 시간(초)보다 적게 남았으면 갱신
+WARM_CONCURRENCY = int(os.getenv("CACHE_WARM_CONCURRENCY", "2"))  # 동시에 갱신할 검색어 수
+WARM_TOP_QUERIES = int(os.getenv("CACHE_WARM_TOP_QUERIES", "5"))  # 페이지마다 추가로 미리 채울 인기 검색어 수
+WARM_MIN_SEARCHES = float(os.getenv("CACHE_WARM_MIN_SEARCHES", "1.5"))  # 시간 감소를 반영한 검색 횟수가 이 이상인 인기 검색어만 사용
+
+
+# 쉼표로 구분한 환경 변수 목록 (없으면 기본값)
+def _query_list(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return [query.strip() for query in value.split(",") if query.strip()]
+
+
+# 페이지별로 미리 채울 검색어 - 입력창 예시, TREND NEWS 주제, 계절 검색어
+HOT_QUERIES = {
+    "trend_info": _query_list("WARM_TREND_QUERIES", [
+        "Y2K 패션", "아방가르드", "하이엔드", "S/S 컬렉션", "스트리트 패션", "친환경 패션", "패션테크", "액세서리 트렌드",
+    ]),
+    "brands": _query_list("WARM_BRAND_QUERIES", ["구찌", "프라다", "나이키", "샤넬", "디올"]),
+    "styling": _query_list("WARM_STYLING_QUERIES", ["미니멀 스타일링", "블루 코트", "캐주얼 룩", "여름 코디", "겨울 코디"]),
+}
+
+# 페이지마다 화면에서 사용하는 것과 같은 조건: (LLM 응답 종류, 이미지 검색어 만들기, 이미지 수)
+PAGE_SEARCHES = {
+    "trend_info": ("trend", lambda query: query, 3),
+    "brands": ("term", lambda query: f"{query} fashion brand", 1),
+    "styling": (None, lambda query: query, PAGE_SIZE),
+}
+
+LLM_REQUESTS = {
+    "trend": (TREND_PROMPT_VERSION, TREND_TEMPERATURE, fetch_fashion_trend_info),
+    "term": (TERM_PROMPT_VERSION, TERM_TEMPERATURE, fetch_fashion_term_info),
+}
+
+
+# 자주 찾는 검색어의 LLM 응답과 이미지 검색 결과를 만료 전에 백그라운드에서 다시 받아두는 캐시 예열기
+# 사용자의 첫 검색도 API가 아닌 캐시에서 바로 응답하도록 함
+# 동시에 WARM_CONCURRENCY개까지만 갱신하고, 이미지 검색은 사용자 검색용 예비 할당량을 쓰지 않음
+# tracker가 있으면 설정된 검색어에 실제로 많이 찾는 검색어를 더함
+class CacheWarmer:
+    def __init__(self, engine, llm_cache, hot_queries=HOT_QUERIES, tracker=None):
+        self.engine = engine
+        self.llm_cache = llm_cache
+        self.hot_queries = hot_queries
+        self.tracker = tracker
+        self.openai_client = None
+        self.image_api_keys = {}
+        self.refreshed = 0
+        self.fresh = 0
+        self.failures = 0
+        self.rounds = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=WARM_CONCURRENCY, thread_name_prefix="cache-warm")
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # (페이지, 검색어) 목록
+    def queries(self):
+        pairs = [(page, query) for page, queries in self.hot_queries.items() for query in queries]
+        if self.tracker is not None:
+            seen = {(page, canonicalize_query(query)) for page, query in pairs}
+            for page in PAGE_SEARCHES:
+                for _, query, count in self.tracker.top_queries(page, WARM_TOP_QUERIES):
+                    if count >= WARM_MIN_SEARCHES and (page, query) not in seen:
+                        pairs.append((page, query))
+        return pairs
+
+    # 한 번만 시작 (openai_client가 None이면 LLM 응답은 건너뛰고 이미지만 미리 채움)
+    def start(self, openai_client, image_api_keys):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.openai_client = openai_client
+            self.image_api_keys = image_api_keys
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self.warm_all()
+            time.sleep(WARM_INTERVAL)
+
+    # 모든 검색어를 한 번씩 확인하고 만료가 가까운 캐시만 갱신
+    def warm_all(self):
+        list(self._executor.map(lambda item: self._warm(*item), self.queries()))
+        self._count("rounds")
+
+    def _warm(self, page, query):
+        kind, image_query, count = PAGE_SEARCHES[page]
+        if kind and self.openai_client is not None:
+            self._warm_llm(kind, query)
+        if any(self.image_api_keys.values()):
+            self._warm_images(image_query(query), count)
+
+    def _warm_llm(self, kind, query):
+        prompt_version, temperature, fetch = LLM_REQUESTS[kind]
+        key = make_llm_cache_key(kind, query, OPENAI_MODEL, prompt_version, temperature)
+        entry = self.llm_cache.store.peek(key)
+        if entry is not None and entry[0] + self.llm_cache.ttl - time.time() > WARM_AHEAD:
+            self._count("fresh")
+            return
+
+        def fetch_and_store():
+            value = fetch(self.openai_client, query)
+            if value is not None:
+                self.llm_cache.put(key, value)
+            return value
+
+        try:
+            self.llm_cache.flight.do(key, fetch_and_store)
+            self._count("refreshed")
+        except Exception:
+            self._count("failures")
+
+    def _warm_images(self, query, count):
+        expires_in = self.engine.cache_expires_in(query, count, self.image_api_keys, llm_client=self.openai_client)
+        if expires_in is not None and expires_in > WARM_AHEAD:
+            self._count("fresh")
+            return
+
+        try:
+            self.engine.search(query, count, self.image_api_keys, llm_client=self.openai_client, background=True)
+        except Exception:
+            self._count("failures")
+            return
+        # 실제 이미지를 하나도 얻지 못한 결과는 캐시에 저장되지 않음
+        expires_in = self.engine.cache_expires_in(query, count, self.image_api_keys, llm_client=self.openai_client)
+        self._count("failures" if expires_in is None else "refreshed")
+
+    def stats(self):
+        with self._lock:
+            return {"refreshed": self.refreshed, "fresh": self.fresh, "failures": self.failures, "rounds": self.rounds}
+
+
+# 프로세스 전체에서 공유하는 캐시 예열기
+@st.cache_resource
+def get_cache_warmer():
+    return CacheWarmer(get_image_search_engine(), get_llm_cache(), tracker=get_query_tracker())
+
+
+# 서버에 설정된 API 키로 캐시 예열 시작 - 사용자가 입력한 키는 사용하지 않음
+# 이미지 키는 세션 기본값과 같은 키를 써야 사용자 검색과 같은 캐시 항목을 채움
+def start_cache_warmer():
+    warmer = get_cache_warmer()
+    if not CACHE_WARMING:
+        return warmer
+
+    openai_key = os.getenv("OPENAI_API_KEY", "")
+    image_api_keys = get_default_image_api_keys()
+    if openai_key or any(image_api_keys.values()):
+        warmer.start(get_openai_client(openai_key) if openai_key else None, image_api_keys)
+    return warmer
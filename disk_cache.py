@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+# 캐시 파일 위치 (프로세스 재시작 후에도 유지되고 모든 세션이 공유)
+CACHE_DIR = os.getenv("TREND_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+CACHE_PATH = os.path.join(CACHE_DIR, "trend_setter.sqlite3")
+
+
+# SQLite에 압축된 JSON으로 저장하는 TTL + LRU 캐시
+# namespace마다 최대 용량을 두고, 넘치면 가장 오래 사용되지 않은 항목부터 삭제
+class DiskCache:
+    def __init__(self, namespace, max_bytes, path=CACHE_PATH):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, accessed_at)")
+
+    # 스레드마다 별도의 연결 사용
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # (값, 저장 시각)을 반환하고, 없거나 만료되었으면 None
+    def get_entry(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, created_at, expires_at FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+
+        if row is None:
+            self._count(False)
+            return None
+
+        value, created_at, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._count(False)
+            return None
+
+        conn.execute(
+            "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, self.namespace, key)
+        )
+        self._count(True)
+        return json.loads(zlib.decompress(value)), created_at
+
+    # (저장 시각, 만료 시각)만 확인하고 적중 횟수나 사용 시각은 바꾸지 않음 (없거나 만료되었으면 None)
+    def peek(self, key):
+        row = self._connect().execute(
+            "SELECT created_at, expires_at FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0], row[1]
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    # ttl이 None이면 용량 초과로 밀려날 때까지 유지
+    def set(self, key, value, ttl=None):
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, size, created_at, expires_at, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.namespace, key, blob, len(blob), now, expires_at, now)
+        )
+        self._evict(conn)
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    # 용량을 넘으면 만료된 항목과 가장 오래 사용되지 않은 항목부터 삭제
+    def _evict(self, conn):
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        conn.execute(
+            "DELETE FROM entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, time.time())
+        )
+        rows = conn.execute(
+            "SELECT key, size FROM entries WHERE namespace = ? ORDER BY accessed_at DESC",
+            (self.namespace,)
+        ).fetchall()
+
+        kept = 0
+        stale_keys = []
+        for key, size in rows:
+            kept += size
+            if kept > self.max_bytes:
+                stale_keys.append((self.namespace, key))
+        conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", stale_keys)
+
+    # 항목 수, 저장 용량, 적중/실패 횟수
+    def stats(self):
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        with self._lock:
+            return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
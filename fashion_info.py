@@ -0,0 +1,404 @@
+import os
+import re
+import json
+import time
+import threading
+import unicodedata
+import concurrent.futures
+
+import streamlit as st
+from openai import OpenAI
+
+from disk_cache import DiskCache
+from json_stream import IncrementalJSONObjectParser
+from pending_render import run_while_pending, iter_while_pending
+from singleflight import get_single_flight
+
+OPENAI_MODEL = "gpt-3.5-turbo"
+
+# 프롬프트를 바꾸면 버전을 올려서 이전 캐시를 사용하지 않도록 함
+TREND_PROMPT_VERSION = "trend-v1"
+TERM_PROMPT_VERSION = "term-v1"
+TREND_TEMPERATURE = 0.7
+TERM_TEMPERATURE = 1.0
+
+# 응답 캐시 설정 (초 단위)
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))  # 이 시간 동안은 그대로 사용
+LLM_CACHE_STALE_TTL = int(os.getenv("LLM_CACHE_STALE_TTL", str(7 * 24 * 3600)))  # 이후에는 오래된 응답을 보여주면서 갱신
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+
+# 트렌드 설명을 토큰 단위로 스트리밍해서 표시 (0이면 전체 응답을 기다림)
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") == "1"
+
+REQUIRED_TERM_KEYS = ["definition", "examples", "brands", "related_terms"]
+
+
+# API에서 빈 응답을 받은 경우
+class EmptyResponseError(Exception):
+    pass
+
+
+# 검색어 정규화 (대소문자, 공백, 전각 문자 차이 무시)
+def canonicalize_query(query):
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
+def make_llm_cache_key(kind, query, model, prompt_version, temperature):
+    return f"{kind}|{model}|{prompt_version}|{temperature}|{canonicalize_query(query)}"
+
+
+# 오래된 응답을 먼저 돌려주고 백그라운드에서 갱신하는(stale-while-revalidate) 응답 캐시
+# 캐시에 없는 같은 키의 동시 요청은 flight로 하나의 호출만 보냄
+class LLMResponseCache:
+    def __init__(self, store, flight, ttl=LLM_CACHE_TTL, stale_ttl=LLM_CACHE_STALE_TTL):
+        self.store = store
+        self.flight = flight
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-refresh")
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # 캐시에 있으면 값을 반환(오래된 값이면 fetch로 백그라운드 갱신), 없으면 None
+    def lookup(self, key, fetch):
+        entry = self.store.get_entry(key)
+        if entry is None:
+            self._count("misses")
+            return None
+
+        value, created_at = entry
+        if time.time() - created_at < self.ttl:
+            self._count("hits")
+        else:
+            self._count("stale_hits")
+            self.refresh_in_background(key, fetch)
+        return value
+
+    def get_or_fetch(self, key, fetch):
+        value = self.lookup(key, fetch)
+        if value is not None:
+            return value
+
+        def fetch_and_store():
+            value = fetch()
+            if value is not None:
+                self.put(key, value)
+            return value
+
+        return self.flight.do(key, fetch_and_store)
+
+    def put(self, key, value):
+        self.store.set(key, value, self.ttl + self.stale_ttl)
+
+    # 같은 키는 한 번만 갱신
+    def refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, key, fetch)
+
+    def _refresh(self, key, fetch):
+        try:
+            value = fetch()
+            if value is not None:
+                self.put(key, value)
+            self._count("refreshes")
+        except Exception:
+            self._count("refresh_errors")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+            }
+
+
+# API 키마다 하나의 OpenAI 클라이언트를 재사용
+@st.cache_resource
+def get_openai_client(api_key):
+    return OpenAI(api_key=api_key)
+
+
+# 프로세스 전체에서 공유하는 응답 캐시
+@st.cache_resource
+def get_llm_cache():
+    return LLMResponseCache(DiskCache("llm", LLM_CACHE_MAX_BYTES), get_single_flight("llm"))
+
+
+# 트렌드 설명 프롬프트 (바꾸면 TREND_PROMPT_VERSION도 올릴 것)
+def build_trend_messages(query):
+    return [
+        {"role": "system", "content": "당신은 패션 용어와 트렌드에 대한 설명을 제공하는 패션 전문가입니다. 사용자가 입력한 패션 용어나 트렌드에 대해 자세히 설명해주세요."},
+        {"role": "user", "content": f"다음 패션 용어/트렌드의 의미와 특징을 알려주세요: {query}"}
+    ]
+
+
+# GPT를 통한 트렌드 정보 검색 (Streamlit 호출 없이 예외를 그대로 전달)
+def fetch_fashion_trend_info(client, query):
+    # 최대 3번 시도
+    max_attempts = 3
+    for attempt in range(max_attempts):
+        try:
+            response = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=build_trend_messages(query),
+                temperature=TREND_TEMPERATURE,
+                max_tokens=500
+            )
+
+            content = response.choices[0].message.content
+            if content and len(content.strip()) > 0:
+                return {"description": content.strip()}
+            if attempt < max_attempts - 1:
+                time.sleep(1)  # 잠시 대기 후 재시도
+                continue
+            raise EmptyResponseError("API에서 빈 응답을 받았습니다.")
+        except EmptyResponseError:
+            raise
+        except Exception:
+            if attempt < max_attempts - 1:
+                time.sleep(1)  # 잠시 대기 후 재시도
+                continue
+            raise
+
+
+# 트렌드 설명을 스트리밍으로 받아 텍스트 조각을 순서대로 반환
+# 빈 응답이면 다시 시도하고, 이미 일부를 보여준 뒤의 오류는 그대로 전달
+def stream_fashion_trend_info(client, query):
+    max_attempts = 3
+    for attempt in range(max_attempts):
+        produced = False
+        try:
+            stream = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=build_trend_messages(query),
+                temperature=TREND_TEMPERATURE,
+                max_tokens=500,
+                stream=True
+            )
+
+            # 앞쪽 공백은 실제 내용이 나올 때까지 보류
+            pending = ""
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if not produced:
+                    pending += delta
+                    if not pending.strip():
+                        continue
+                    delta = pending.lstrip()
+                    produced = True
+                yield delta
+
+            if produced:
+                return
+            if attempt < max_attempts - 1:
+                time.sleep(1)  # 잠시 대기 후 재시도
+                continue
+            raise EmptyResponseError("API에서 빈 응답을 받았습니다.")
+        except EmptyResponseError:
+            raise
+        except Exception:
+            if produced or attempt >= max_attempts - 1:
+                raise
+            time.sleep(1)  # 잠시 대기 후 재시도
+
+
+# 패션 용어/브랜드 정보 프롬프트 (바꾸면 TERM_PROMPT_VERSION도 올릴 것)
+def build_term_messages(query):
+    return [
+        {"role": "system", "content": "당신은 패션 전문가입니다. 패션 용어와 브랜드에 대한 상세한 정보를 제공해주세요. 응답은 반드시 유효한 JSON 형식이어야 합니다."},
+        {"role": "user", "content": f"다음 패션 용어 또는 브랜드에 대해 알려주세요: {query}. 다음 JSON 형식으로만 응답해주세요(추가 텍스트 없이): {{\"definition\": \"정의\", \"examples\": [\"예시1\", \"예시2\"], \"brands\": [\"브랜드1\", \"브랜드2\"], \"related_terms\": [\"관련용어1\", \"관련용어2\"]}}"}
+    ]
+
+
+# 필드 형식 맞추기 (definition은 문자열, 나머지는 목록)
+def normalize_term_field(key, value):
+    if key == "definition":
+        return value if isinstance(value, str) else str(value)
+    return value if isinstance(value, list) else [value]
+
+
+# 패션 용어/브랜드 정보 검색 - 파싱하고 필수 키를 확인한 결과를 반환
+def fetch_fashion_term_info(client, query):
+    response = client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=build_term_messages(query),
+        temperature=TERM_TEMPERATURE,
+        response_format={"type": "json_object"}
+    )
+    return parse_term_info(response.choices[0].message.content)
+
+
+# JSON 응답을 파싱하고 필수 키를 확인
+def parse_term_info(text):
+    term_info = json.loads(text)
+
+    # 필수 키가 있는지 확인
+    for key in REQUIRED_TERM_KEYS:
+        if key not in term_info:
+            raise KeyError(key)
+    return {key: normalize_term_field(key, term_info[key]) for key in REQUIRED_TERM_KEYS}
+
+
+# 패션 용어/브랜드 정보를 스트리밍으로 받아 JSON 텍스트 조각을 반환
+def stream_fashion_term_info(client, query):
+    stream = client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=build_term_messages(query),
+        temperature=TERM_TEMPERATURE,
+        response_format={"type": "json_object"},
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+# 브랜드 정보를 필드가 준비되는 대로 (키, 값, 완료 여부)로 반환 (캐시 사용)
+# 스트리밍 중에는 작성 중인 definition도 완료 여부 False로 먼저 전달
+# 필수 키는 도착할 때마다 확인하고, 빠진 키가 있으면 객체가 닫히는 즉시 KeyError
+# pending을 주면 응답은 다른 스레드에서 기다리고, 그동안 끝난 다른 섹션을 바로 그림
+def iter_fashion_term_info(query, pending=None):
+    client = get_openai_client(st.session_state.openai_api_key)
+    key = make_llm_cache_key("term", query, OPENAI_MODEL, TERM_PROMPT_VERSION, TERM_TEMPERATURE)
+    fields = _iter_term_info(client, key, query, get_llm_cache(), get_single_flight("llm"))
+    return fields if pending is None else iter_while_pending(fields, pending)
+
+
+# iter_fashion_term_info의 본체 (Streamlit을 호출하지 않으므로 다른 스레드에서 진행 가능)
+def _iter_term_info(client, key, query, cache, flight):
+    if LLM_STREAMING:
+        term_info = cache.lookup(key, lambda: fetch_fashion_term_info(client, query))
+    else:
+        term_info = cache.get_or_fetch(key, lambda: fetch_fashion_term_info(client, query))
+    if term_info is not None:
+        for field in REQUIRED_TERM_KEYS:
+            yield field, term_info[field], True
+        return
+
+    # 같은 브랜드를 동시에 검색하는 세션들은 하나의 스트림을 함께 받고, 스트림이 끝나면 한 번만 캐시에 저장
+    def store(chunks):
+        cache.put(key, parse_term_info("".join(chunks)))
+
+    chunks = flight.stream(key, lambda: stream_fashion_term_info(client, query), on_complete=store)
+
+    parser = IncrementalJSONObjectParser()
+    term_info = {}
+    last_partial = None
+    for chunk in chunks:
+        for field, value in parser.feed(chunk):
+            if field in REQUIRED_TERM_KEYS and field not in term_info:
+                term_info[field] = normalize_term_field(field, value)
+                yield field, term_info[field], True
+
+        partial = parser.partial_string()
+        if partial and partial != last_partial and partial[0] in REQUIRED_TERM_KEYS and partial[0] not in term_info:
+            last_partial = partial
+            yield partial[0], partial[1], False
+
+        if parser.closed:
+            break
+
+    parser.close()
+    for field in REQUIRED_TERM_KEYS:
+        if field not in term_info:
+            raise KeyError(field)
+
+
+# 브랜드 정보 조회 중 발생한 오류 표시
+def report_term_info_error(e):
+    if isinstance(e, json.JSONDecodeError):
+        st.error(f"JSON 파싱 오류: {e}")
+        st.error("API 응답이 올바른 JSON 형식이 아닙니다. 다시 시도해 주세요.")
+    elif isinstance(e, KeyError):
+        st.error(f"API 응답에 필요한 '{e.args[0]}' 정보가 없습니다. 다시 시도해 주세요.")
+        st.error(f"필수 데이터 누락: Missing required key: {e.args[0]}")
+    else:
+        st.error(f"OpenAI API 호출 중 오류 발생: {e}")
+
+
+# 트렌드/용어 정보 가져오기 (캐시 사용)
+# pending을 주면 응답은 다른 스레드에서 기다리고, 그동안 끝난 다른 섹션을 바로 그림
+def get_fashion_trend_info(query, pending=None):
+    if not st.session_state.openai_api_key:
+        st.error("OpenAI API 키를 입력해주세요. 사이드바의 'API 키 설정'에서 입력할 수 있습니다.")
+        return None
+
+    client = get_openai_client(st.session_state.openai_api_key)
+    key = make_llm_cache_key("trend", query, OPENAI_MODEL, TREND_PROMPT_VERSION, TREND_TEMPERATURE)
+    cache = get_llm_cache()
+
+    def fetch():
+        return cache.get_or_fetch(key, lambda: fetch_fashion_trend_info(client, query))
+
+    try:
+        return fetch() if pending is None else run_while_pending(fetch, pending)
+    except EmptyResponseError:
+        st.error("API에서 빈 응답을 받았습니다. 다른 검색어로 시도해 보세요.")
+    except Exception as e:
+        st.error(f"OpenAI API 호출 중 오류 발생: {e}")
+    return None
+
+
+# 트렌드 설명을 화면에 표시하고 결과를 반환 (캐시 사용)
+# 스트리밍 모드에서는 토큰이 도착하는 대로 표시하고, 완성된 텍스트를 캐시에 저장
+# pending을 주면 응답은 다른 스레드에서 기다리고, 그동안 끝난 다른 섹션을 바로 그림
+def write_fashion_trend_info(query, pending=None):
+    if not LLM_STREAMING:
+        with st.spinner("정보를 검색 중입니다..."):
+            trend_info = get_fashion_trend_info(query, pending)
+        if trend_info:
+            st.write(trend_info["description"])
+        return trend_info
+
+    if not st.session_state.openai_api_key:
+        st.error("OpenAI API 키를 입력해주세요. 사이드바의 'API 키 설정'에서 입력할 수 있습니다.")
+        return None
+
+    client = get_openai_client(st.session_state.openai_api_key)
+    key = make_llm_cache_key("trend", query, OPENAI_MODEL, TREND_PROMPT_VERSION, TREND_TEMPERATURE)
+    cache = get_llm_cache()
+
+    trend_info = cache.lookup(key, lambda: fetch_fashion_trend_info(client, query))
+    if trend_info is not None:
+        st.write(trend_info["description"])
+        return trend_info
+
+    # 같은 검색어를 동시에 검색하는 세션들은 하나의 스트림을 함께 받고, 스트림이 끝나면 한 번만 캐시에 저장
+    def store(chunks):
+        cache.put(key, {"description": "".join(chunks).strip()})
+
+    stream = get_single_flight("llm").stream(key, lambda: stream_fashion_trend_info(client, query), on_complete=store)
+
+    try:
+        text = st.write_stream(stream if pending is None else iter_while_pending(stream, pending))
+    except EmptyResponseError:
+        st.error("API에서 빈 응답을 받았습니다. 다른 검색어로 시도해 보세요.")
+        return None
+    except Exception as e:
+        st.error(f"OpenAI API 호출 중 오류 발생: {e}")
+        return None
+
+    return {"description": text.strip()}
+
@@ -0,0 +1,68 @@
+import os
+import threading
+import http.cookiejar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+import streamlit as st
+
+# 연결 풀 설정 (환경 변수로 조정 가능)
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # 유지할 호스트별 풀 개수
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))  # 호스트당 keep-alive 연결 수
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+
+# 호스트별 keep-alive 연결 풀을 공유하는 HTTP 클라이언트
+class HttpClient:
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        # 여러 사용자가 같은 세션을 공유하므로 쿠키는 저장하지 않음
+        self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+        self._lock = threading.Lock()
+        self._requests = {}
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).hostname
+        with self._lock:
+            self._requests[host] = self._requests.get(host, 0) + 1
+        return self.session.get(url, **kwargs)
+
+    # 호스트별 요청 수, 새로 연결한 수, 재사용한 수
+    def stats(self):
+        pools = self.adapter.poolmanager.pools
+        connections = {}
+        for key in pools.keys():
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            connections[pool.host] = connections.get(pool.host, 0) + pool.num_connections
+
+        with self._lock:
+            requests_by_host = dict(self._requests)
+
+        stats = {}
+        for host, count in requests_by_host.items():
+            opened = connections.get(host, 0)
+            stats[host] = {
+                "requests": count,
+                "connections": opened,
+                "reused": max(count - opened, 0),
+            }
+        return stats
+
+
+# 프로세스 전체(모든 세션과 재실행)에서 공유하는 HTTP 클라이언트
+@st.cache_resource
+def get_http_client():
+    return HttpClient()
@@ -0,0 +1,108 @@
+import os
+import time
+import threading
+import concurrent.futures
+from io import BytesIO
+
+from PIL import Image
+
+# 지각 해시(dHash) 설정
+HASH_SIZE = 8  # 8x8 = 64비트
+DUPLICATE_DISTANCE = int(os.getenv("IMAGE_HASH_DISTANCE", "6"))  # 해밍 거리가 이 이하면 같은 사진으로 봄
+HASH_CACHE_TTL = 30 * 24 * 3600
+HASH_WORKERS = 16
+
+
+# 차이 해시: 흑백 (size+1) x size로 줄인 뒤 가로로 이웃한 픽셀의 밝기 비교
+def dhash(image, size=HASH_SIZE):
+    image.draft("L", (size * 8, size * 8))
+    pixels = list(image.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS).getdata())
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+# 작은 썸네일을 동시에 받아 지각 해시를 계산하고 URL별로 저장하는 해시 계산기
+class PerceptualHasher:
+    def __init__(self, http, store):
+        self.http = http
+        self.store = store
+        self.computed = 0
+        self.cache_hits = 0
+        self.failures = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="image-hash")
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _hash(self, result, timeout):
+        key = result.canonical_url
+        cached = self.store.get(key)
+        if cached is not None:
+            self._count("cache_hits")
+            return cached
+
+        response = self.http.get(result.thumbnail_url or result.url, timeout=timeout)
+        response.raise_for_status()
+        value = dhash(Image.open(BytesIO(response.content)))
+        self.store.set(key, value, HASH_CACHE_TTL)
+        self._count("computed")
+        return value
+
+    # ImageResult마다 해시를 반환 (기한 안에 못 받았거나 실패하면 None)
+    def hash_many(self, results, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return [None] * len(results)
+
+        futures = [self._executor.submit(self._hash, result, remaining) for result in results]
+        concurrent.futures.wait(futures, timeout=remaining)
+        hashes = []
+        for future in futures:
+            if future.done() and future.exception() is None:
+                hashes.append(future.result())
+            else:
+                future.cancel()
+                self._count("failures")
+                hashes.append(None)
+        return hashes
+
+    # 순서대로 count개를 고르되 이미 고른 이미지와 거의 같은 사진은 건너뛰고 다음 후보로 채움
+    # 해시를 구하지 못한 이미지는 비교 없이 그대로 사용
+    def select_distinct(self, candidates, count, deadline, overfetch):
+        selected = []
+        hashes = []
+        index = 0
+        while len(selected) < count and index < len(candidates):
+            batch = candidates[index:index + count - len(selected) + overfetch]
+            index += len(batch)
+            for candidate, value in zip(batch, self.hash_many(batch, deadline)):
+                if len(selected) >= count:
+                    break
+                if value is not None:
+                    if any(hamming_distance(value, other) <= DUPLICATE_DISTANCE for other in hashes):
+                        self._count("duplicates")
+                        continue
+                    hashes.append(value)
+                selected.append(candidate)
+        return selected
+
+    def stats(self):
+        with self._lock:
+            return {
+                "computed": self.computed,
+                "cache_hits": self.cache_hits,
+                "failures": self.failures,
+                "duplicates": self.duplicates,
+            }
@@ -0,0 +1,194 @@
+import threading
+import concurrent.futures
+
+import streamlit as st
+
+from rate_limit import RateLimitedError
+from image_ranking import rank_candidates
+from image_search import (
+    PROVIDERS, KEYWORD_SUFFIXES, WIDE_PAGE_SIZE, ImageDeduplicator, ImageResult,
+    build_search_keywords, get_query_language, get_image_search_engine, get_image_api_keys, get_translation_client
+)
+
+# 한 번에 보여줄 이미지 수 ("더 보기" 한 번에 추가되는 수)
+PAGE_SIZE = 6
+# 버퍼에 남은 이미지가 이만큼의 페이지보다 적으면 다음 제공자 페이지를 미리 받음
+PREFETCH_PAGES = 2
+# "더 보기"에서 미리 받는 중인 페이지를 기다리는 최대 시간 (초)
+LOAD_MORE_TIMEOUT = 10
+# 세션마다 기억해 둘 페이지 탐색 상태 수
+MAX_PAGERS = 5
+
+
+# 한 검색어의 다음 페이지 이미지를 제공자별 페이지 위치(cursor)로 이어서 받는 탐색기
+# 처음 검색에서 받고 고르지 않은 나머지 후보로 버퍼를 채우고, 부족해지면 다음 페이지를 백그라운드에서 받음
+# "더 보기"는 버퍼에서 바로 꺼냄 (처음부터 다시 검색하지 않음)
+class ImagePager:
+    def __init__(self, engine, queries, api_keys, orientation, shown, seed=None):
+        self.engine = engine
+        self.queries = queries
+        self.api_keys = api_keys
+        self.orientation = orientation
+        self.buffer = []
+        self.errors = []
+        self.fetched_pages = 0
+        self._lock = threading.Lock()
+        self._prefetch = None
+
+        # 이미 표시한 이미지는 다시 보여주지 않음
+        self.dedup = ImageDeduplicator()
+        for url in shown:
+            self.dedup.add(ImageResult(url, ""))
+        if seed is not None:
+            self.buffer = [candidate for candidate in seed.extras if self.dedup.add(candidate)]
+
+        # (제공자, 키워드)마다 다음에 받을 페이지
+        # 처음 검색에서 응답한 제공자는 같은 키워드의 2페이지부터 (1페이지는 이미 버퍼에 있음)
+        # 나머지 제공자는 제공자/언어별로 효율이 가장 좋은 키워드 변형 하나로 1페이지부터
+        self.cursors = {}
+        seeded = set()
+        for (provider, keyword), page in (seed.next_pages if seed is not None else {}).items():
+            if api_keys.get(provider):
+                seeded.add(provider)
+                if page:
+                    self.cursors[(provider, keyword)] = page
+        for provider in PROVIDERS:
+            if not api_keys.get(provider) or provider in seeded:
+                continue
+            for query in queries:
+                language = get_query_language(query)
+                suffixes = engine.keyword_stats.order(provider, language, KEYWORD_SUFFIXES[language])[:1]
+                for keyword in build_search_keywords(query, suffixes):
+                    self.cursors[(provider, keyword)] = 1
+
+    # 더 받을 페이지가 남아 있는지
+    def has_more(self):
+        with self._lock:
+            return bool(self.buffer or self.cursors)
+
+    # 다음에 받을 (제공자, 키워드) 순서 - 할당량이 남은 제공자를 먼저, 그 안에서는 건강하고 빠른 제공자 순
+    def _ordered_cursors(self):
+        with self._lock:
+            cursors = list(self.cursors.items())
+        providers = self.engine.health.rank(list(dict.fromkeys(provider for (provider, _), _ in cursors)))
+        providers = sorted(providers, key=lambda provider: not self.engine.limiter.has_headroom(provider, self.api_keys[provider]))
+        return sorted(cursors, key=lambda item: providers.index(item[0][0]))
+
+    # 선호 순서대로 처음 요청을 보낼 수 있는 (제공자, 키워드)의 다음 페이지 하나를 받아 버퍼에 추가
+    # 받은 개수가 페이지 크기보다 적거나 오류가 나면 그 (제공자, 키워드)는 끝난 것으로 봄
+    # 할당량이 없거나 회로가 열린 제공자는 이번에는 건너뜀 (요청을 하나도 보내지 못하면 False)
+    def _fetch_next_page(self):
+        for (provider, keyword), page in self._ordered_cursors():
+            health = self.engine.health.get(provider)
+            allowed = health.admit()
+            if allowed == 0:
+                continue
+            if not self.engine.limiter.try_acquire(provider, self.api_keys[provider], essential=False):
+                if allowed == 1:
+                    health.cancel_probe()
+                continue
+
+            try:
+                candidates = self.engine.fetch(
+                    provider, keyword, WIDE_PAGE_SIZE[provider], self.api_keys[provider], self.orientation, page
+                )
+            except RateLimitedError:
+                return True
+            except Exception as e:
+                with self._lock:
+                    self.errors.append((provider, keyword, e))
+                    self.cursors.pop((provider, keyword), None)
+                return True
+
+            # 받은 페이지는 검색어와 잘 맞는 순서로 정렬해서 버퍼 뒤에 붙임
+            with self._lock:
+                self.fetched_pages += 1
+                if len(candidates) < WIDE_PAGE_SIZE[provider]:
+                    self.cursors.pop((provider, keyword), None)
+                else:
+                    self.cursors[(provider, keyword)] = page + 1
+                batch = [candidate for candidate in candidates if self.dedup.add(candidate)]
+            batch = rank_candidates(" ".join(self.queries), batch)
+            with self._lock:
+                self.buffer.extend(batch)
+            return True
+        return False
+
+    # 버퍼가 count개를 넘을 때까지 한 페이지씩 받음 (더 받을 수 없으면 중단)
+    def _fill(self, count):
+        while True:
+            with self._lock:
+                if len(self.buffer) >= count or not self.cursors:
+                    return
+            if not self._fetch_next_page():
+                return
+
+    # 버퍼가 부족하면 백그라운드에서 다음 페이지를 미리 받기 시작
+    def prefetch(self, count=PAGE_SIZE):
+        with self._lock:
+            if self._prefetch and not self._prefetch.done():
+                return
+            if len(self.buffer) >= count * PREFETCH_PAGES or not self.cursors:
+                return
+            self._prefetch = self.engine.jobs.submit(self._fill, count * PREFETCH_PAGES)
+
+    # 다음 count개의 ImageResult를 반환 (남은 이미지가 없으면 빈 목록)
+    # 버퍼에 있으면 바로 꺼내고, 부족하면 미리 받는 중인 페이지를 기다린 뒤 버퍼가 줄었으면 다시 미리 받음
+    def next_page(self, count=PAGE_SIZE, timeout=LOAD_MORE_TIMEOUT):
+        with self._lock:
+            enough = len(self.buffer) >= count
+        if not enough:
+            self.prefetch(count)
+            with self._lock:
+                pending = self._prefetch if self._prefetch and not self._prefetch.done() else None
+            if pending is not None:
+                try:
+                    pending.result(timeout=timeout)
+                except concurrent.futures.TimeoutError:
+                    pass
+
+        with self._lock:
+            page, self.buffer = self.buffer[:count], self.buffer[count:]
+        self.prefetch(count)
+        return page
+
+    # 지난번 이후 생긴 (제공자, 키워드, 예외) 목록을 꺼냄
+    def take_errors(self):
+        with self._lock:
+            errors, self.errors = self.errors, []
+        return errors
+
+    def stats(self):
+        with self._lock:
+            return {"buffered": len(self.buffer), "fetched_pages": self.fetched_pages, "cursors": len(self.cursors)}
+
+
+# 이 세션에서 검색어의 다음 페이지를 받는 탐색기
+# 없으면 처음 검색의 캐시된 결과(나머지 후보, 제공자별 다음 페이지)로 만들고, 버퍼가 부족할 때만 미리 받기 시작
+# shown: 이미 화면에 표시한 이미지 주소 목록
+# API 키와 번역 클라이언트는 세션 상태를 읽을 수 있는 스크립트 스레드에서 가져옴
+def get_image_pager(query, shown, orientation="portrait"):
+    pagers = st.session_state.setdefault("image_pagers", {})
+    pager = pagers.get((query, orientation))
+    if pager is None:
+        engine = get_image_search_engine()
+        api_keys = get_image_api_keys()
+        llm_client = get_translation_client()
+        queries = engine.search_queries(query, llm_client)
+        seed = engine.cached_result(query, PAGE_SIZE, api_keys, orientation, llm_client=llm_client)
+        pager = ImagePager(engine, queries, api_keys, orientation, shown, seed)
+        pager.prefetch()
+        pagers[(query, orientation)] = pager
+
+        # 오래된 탐색기부터 정리
+        while len(pagers) > MAX_PAGERS:
+            pagers.pop(next(iter(pagers)))
+    return pager
+
+
+# 다음 페이지 (이미지, 출처) 반환 - 페이지를 받다가 생긴 오류는 화면에 표시
+def load_more_images(pager, count=PAGE_SIZE):
+    page = pager.next_page(count)
+    for provider, keyword, e in pager.take_errors():
+        st.error(f"{provider} 검색 오류 ({keyword}): {e}")
+    return [result.url for result in page], [result.provider for result in page]
@@ -0,0 +1,140 @@
+import os
+import hashlib
+import threading
+import concurrent.futures
+from io import BytesIO
+
+import streamlit as st
+from PIL import Image
+
+from http_client import get_http_client
+from singleflight import get_single_flight
+from image_search import sized_image_url
+
+# Streamlit 정적 파일 제공(server.enableStaticServing) 폴더 안에 썸네일 저장
+# app/static/... 주소로 제공되고, ?v= 가 붙은 요청은 브라우저가 오래 캐시함
+THUMB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "thumbs")
+THUMB_URL_PREFIX = "app/static/thumbs"
+# 변환 방식(형식, 품질)을 바꾸면 버전을 올려서 이전 썸네일을 사용하지 않도록 함
+THUMB_VERSION = "1"
+THUMB_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+THUMB_DIR_MAX_BYTES = int(os.getenv("THUMBNAIL_DIR_MAX_BYTES", str(200 * 1024 * 1024)))
+THUMB_WORKERS = 8
+EVICT_EVERY = 50  # 썸네일을 이만큼 만들 때마다 폴더 용량 확인
+
+
+# 썸네일을 만들지 않고 제공자에서 크기를 맞춘 주소로 (src, srcset) 반환
+def sized_thumbnail(url, width):
+    src, high_dpi = sized_image_url(url, width), sized_image_url(url, width * 2)
+    return src, f"{src} 1x, {high_dpi} 2x" if high_dpi != src else ""
+
+
+# 원본 이미지를 한 번 받아 화면에 표시할 너비로 줄인 WebP 썸네일을 만들고 로컬에서 제공하는 프록시
+class ImageProxy:
+    def __init__(self, http, flight, thumb_dir=THUMB_DIR):
+        self.http = http
+        self.flight = flight
+        self.thumb_dir = thumb_dir
+        self.generated = 0
+        self.hits = 0
+        self.failures = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="thumbnail")
+        os.makedirs(thumb_dir, exist_ok=True)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _file_name(self, url, width):
+        digest = hashlib.sha1(f"{THUMB_VERSION}|{width}|{url}".encode("utf-8")).hexdigest()[:24]
+        return f"{digest}_{width}.webp"
+
+    # 제공자 이미지를 2배 너비로 한 번만 받아서 width와 2배 너비 썸네일을 함께 만듦
+    def _generate(self, url, width, paths):
+        if all(os.path.exists(path) for path in paths.values()):
+            return
+        # 원본 대신 필요한 너비에 가장 가까운 제공자 이미지를 받음
+        response = self.http.get(sized_image_url(url, width * 2))
+        response.raise_for_status()
+
+        source = Image.open(BytesIO(response.content))
+        source.draft("RGB", (width * 2, width * 8))
+        source = source.convert("RGB")
+        saved = 0
+        for thumb_width, path in paths.items():
+            image = source
+            if image.width > thumb_width:
+                image = image.resize((thumb_width, round(image.height * thumb_width / image.width)), Image.Resampling.LANCZOS)
+
+            # 다 쓴 뒤 이름을 바꿔서 만드는 중인 파일이 제공되지 않도록 함
+            buffer = BytesIO()
+            image.save(buffer, "WEBP", quality=THUMB_QUALITY, method=4)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(buffer.getvalue())
+            os.replace(temp_path, path)
+            saved = max(saved, buffer.tell())
+
+        self._count("generated")
+        self._count("bytes_saved", max(len(response.content) - saved, 0))
+        if self.generated % EVICT_EVERY == 0:
+            self._evict()
+
+    # (src, srcset) 반환 - 고해상도 화면용으로 2배 너비 썸네일도 srcset에 넣음
+    # 썸네일을 만들 수 없으면 제공자에서 크기를 맞춘 주소를 직접 사용
+    def thumbnail(self, url, width):
+        names = {thumb_width: self._file_name(url, thumb_width) for thumb_width in (width, width * 2)}
+        paths = {thumb_width: os.path.join(self.thumb_dir, name) for thumb_width, name in names.items()}
+        if all(os.path.exists(path) for path in paths.values()):
+            self._count("hits")
+        else:
+            try:
+                self.flight.do(names[width], lambda: self._generate(url, width, paths))
+            except Exception:
+                self._count("failures")
+                return sized_thumbnail(url, width)
+        src, high_dpi = (f"{THUMB_URL_PREFIX}/{names[thumb_width]}?v={THUMB_VERSION}" for thumb_width in (width, width * 2))
+        return src, f"{src} 1x, {high_dpi} 2x"
+
+    # 여러 이미지의 썸네일을 동시에 준비
+    def thumbnails(self, urls, width):
+        return list(self._executor.map(lambda url: self.thumbnail(url, width), urls))
+
+    # 폴더가 최대 용량을 넘으면 오래된 썸네일부터 삭제
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.thumb_dir):
+            if entry.is_file() and entry.name.endswith(".webp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= THUMB_DIR_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "generated": self.generated,
+                "hits": self.hits,
+                "failures": self.failures,
+                "bytes_saved": self.bytes_saved,
+            }
+
+
+# 프로세스 전체에서 공유하는 이미지 프록시
+@st.cache_resource
+def get_image_proxy():
+    return ImageProxy(get_http_client(), get_single_flight("thumbnail"))
+
+
+# 화면에 표시할 너비에 맞춘 썸네일 (src, srcset) 목록
+def get_thumbnails(urls, width):
+    return get_image_proxy().thumbnails(urls, width)
@@ -0,0 +1,35 @@
+import re
+
+import numpy as np
+
+# 검색어 외에 패션 사진임을 나타내는 단어 (검색어 단어보다 낮은 가중치)
+FASHION_TERMS = ["fashion", "style", "outfit", "look", "styling", "trend", "model", "clothing", "wear", "패션", "스타일", "코디", "룩"]
+QUERY_TERM_WEIGHT = 1.0
+FASHION_TERM_WEIGHT = 0.3
+
+
+def tokenize(text):
+    return set(re.findall(r"[0-9a-z가-힣]+", (text or "").lower()))
+
+
+# 후보 이미지를 설명(alt_description, tags 등)과 검색어의 단어 겹침으로 정렬
+# candidates: ImageResult 목록, 반환값: 점수가 높은 순서의 후보 목록
+# 점수가 같으면 제공자가 준 순서(관련도 순)를 유지
+def rank_candidates(query, candidates):
+    if len(candidates) < 2:
+        return list(candidates)
+
+    query_terms = sorted(tokenize(query))
+    fashion_terms = [term for term in FASHION_TERMS if term not in query_terms]
+    terms = query_terms + fashion_terms
+    weights = np.array(
+        [QUERY_TERM_WEIGHT] * len(query_terms) + [FASHION_TERM_WEIGHT] * len(fashion_terms)
+    )
+
+    # 후보 x 단어 포함 여부 행렬과 가중치의 곱으로 한 번에 점수 계산
+    tokens = [tokenize(candidate.description) for candidate in candidates]
+    matches = np.array([[term in candidate for term in terms] for candidate in tokens], dtype=np.float64)
+    scores = matches @ weights
+
+    order = np.argsort(-scores, kind="stable")
+    return [candidates[i] for i in order]
@@ -0,0 +1,698 @@
+import os
+import re
+import time
+import random
+import queue
+import threading
+import unicodedata
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import concurrent.futures
+
+import streamlit as st
+
+from http_client import get_http_client
+from disk_cache import DiskCache
+from singleflight import get_single_flight
+from rate_limit import ProviderRateLimiter, RateLimitedError
+from provider_health import ProviderHealthTracker, HALF_OPEN
+from image_ranking import rank_candidates
+from keyword_stats import KeywordYieldStats
+from image_hash import PerceptualHasher
+from translation import QUERY_TRANSLATION, is_hangul, get_query_translator
+from fashion_info import get_openai_client
+
+# 기본 이미지 (API 호출 실패 시 사용)
+DEFAULT_IMAGES = [
+    "https://images.unsplash.com/photo-1492707892479-7bc8d5a4ee93",
+    "https://images.unsplash.com/photo-1490481651871-ab68de25d43d",
+    "https://images.unsplash.com/photo-1445205170230-053b83016050",
+    "https://images.unsplash.com/photo-1479064555552-3ef4979f8908",
+    "https://images.unsplash.com/photo-1485968579580-b6d095142e6e",
+    "https://images.unsplash.com/photo-1515886657613-9f3515b0c78f",
+    "https://images.unsplash.com/photo-1509631179647-0177331693ae",
+    "https://images.unsplash.com/photo-1566206091558-7f218b696731",
+    "https://images.unsplash.com/photo-1581044777550-4cfa60707c03",
+    "https://images.unsplash.com/photo-1604925529478-b7c844b27290"
+]
+DEFAULT_SOURCE = "Unsplash"
+
+# 동시에 실행할 최대 요청 수 (프로세스 전체 공유)
+MAX_WORKERS = int(os.getenv("IMAGE_SEARCH_WORKERS", "32"))
+
+# 검색 결과 캐시 설정
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+KEYWORD_STATS_MAX_BYTES = 1024 * 1024
+# 제공자별 결과 유지 시간 (초)
+PROVIDER_CACHE_TTL = {
+    "Unsplash": int(os.getenv("IMAGE_CACHE_TTL_UNSPLASH", str(6 * 3600))),
+    "Pexels": int(os.getenv("IMAGE_CACHE_TTL_PEXELS", str(6 * 3600))),
+    "Pixabay": int(os.getenv("IMAGE_CACHE_TTL_PIXABAY", str(24 * 3600))),
+}
+# 기본 이미지로 보충한 결과는 짧게 유지
+PARTIAL_RESULT_TTL = int(os.getenv("IMAGE_CACHE_TTL_PARTIAL", "600"))
+
+# 검색 전체에 허용하는 시간 (밀리초) - 넘으면 그때까지 받은 이미지만 사용
+SEARCH_DEADLINE_MS = int(os.getenv("IMAGE_SEARCH_DEADLINE_MS", "1500"))
+
+# 예비 요청(hedging) 사용 여부 - 끄면 모든 제공자에 처음부터 동시에 요청
+HEDGING = os.getenv("IMAGE_SEARCH_HEDGING", "1") == "1"
+
+# 검색 방식
+# variants: 제공자마다 키워드 변형 여러 개를 요청
+# wide: 제공자마다 최대 페이지 크기로 한 번만 요청하고 설명(alt_description, tags)으로 직접 정렬
+SEARCH_MODE = os.getenv("IMAGE_SEARCH_MODE", "wide")
+# wide 방식에서 사용하는 제공자별 최대 페이지 크기
+WIDE_PAGE_SIZE = {"Unsplash": 30, "Pexels": 80, "Pixabay": 200}
+# 결과로 고르지 않은 나머지 후보 중 "더 보기"용으로 함께 캐시해 둘 수
+MAX_EXTRA_RESULTS = int(os.getenv("IMAGE_SEARCH_MAX_EXTRAS", "60"))
+
+# 한글 검색어는 번역한 영어 검색어와 원래 한글 검색어로 동시에 검색해서 결과를 합침
+BILINGUAL_SEARCH = os.getenv("IMAGE_SEARCH_BILINGUAL", "1") == "1"
+# 개수를 채운 뒤 다른 검색어의 응답을 더 기다리는 시간 (밀리초)
+BILINGUAL_WAIT_MS = int(os.getenv("IMAGE_SEARCH_BILINGUAL_WAIT_MS", "300"))
+# 검색 제한 시간 중 LLM 번역에 쓸 수 있는 비율 (나머지는 이미지 검색에 사용)
+TRANSLATION_BUDGET_SHARE = float(os.getenv("IMAGE_SEARCH_TRANSLATION_SHARE", "0.5"))
+
+# 제공자가 달라도 거의 같은 사진은 지각 해시로 걸러냄
+# 걸러낸 자리를 채울 수 있도록 variants 방식은 요청마다 이만큼 더 받음
+VISUAL_DEDUP = os.getenv("IMAGE_VISUAL_DEDUP", "1") == "1"
+VISUAL_DEDUP_OVERFETCH = int(os.getenv("IMAGE_VISUAL_DEDUP_OVERFETCH", "2"))
+IMAGE_HASH_MAX_BYTES = 2 * 1024 * 1024
+
+
+# 검색 키워드 접미사 (언어별 기본 순서) - 실제 순서는 제공자별 효율 기록으로 조정
+KEYWORD_SUFFIXES = {
+    # 한글 키워드인 경우
+    "ko": ["패션", "스타일링", "코디", "패션 코디", "룩", "트렌드"],
+    # 영문 키워드인 경우
+    "en": ["fashion", "style", "outfit", "look", "styling", "trend"],
+}
+
+
+def get_query_language(query):
+    return "ko" if is_hangul(query) else "en"
+
+
+# 검색 키워드 준비
+def build_search_keywords(query, suffixes=None):
+    if suffixes is None:
+        suffixes = KEYWORD_SUFFIXES[get_query_language(query)]
+    return [f"{query} {suffix}" for suffix in suffixes]
+
+
+# 크기/형식 쿼리 파라미터만 다르고 같은 사진을 가리키는 이미지 CDN
+SIZE_PARAM_HOSTS = {"images.unsplash.com", "plus.unsplash.com", "images.pexels.com"}
+
+
+# 같은 사진이 다른 URL로 와도 같은 값이 되도록 URL 정규화
+def canonicalize_image_url(url):
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    query = "" if host in SIZE_PARAM_HOSTS else parts.query
+    return urlunsplit(("https", host, parts.path.rstrip("/"), query, ""))
+
+
+# Pixabay webformatURL에서 _640 부분을 바꿔 받을 수 있는 크기 (너비가 아니라 긴 변의 최대 길이)
+PIXABAY_SIZES = [180, 340, 640, 960]
+# 크기를 모를 때 가정하는 세로/가로 비율 - 검색은 기본으로 세로(portrait) 사진을 요청함
+PIXABAY_DEFAULT_ASPECT = 1.5
+PIXABAY_SIZE_SUFFIX = re.compile(r"_(180|340|640|960)(\.\w+)$")
+
+
+def _replace_query(parts, drop, updates):
+    params = [(key, value) for key, value in parse_qsl(parts.query) if key not in drop and key not in updates]
+    return urlunsplit(parts._replace(query=urlencode(params + list(updates.items()))))
+
+
+# 표시할 너비(px)를 덮는 가장 작은 크기의 제공자 이미지 주소
+# Unsplash(imgix)와 Pexels는 w 파라미터로 크기를 바꾸고, Pixabay는 파일 이름의 크기 접미사를 바꿈
+# aspect: 세로/가로 비율 - Pixabay는 긴 변 기준 크기이므로 세로 사진은 너비에 비율을 곱한 크기가 필요
+# 그 밖의 주소는 그대로 반환
+def sized_image_url(url, width, aspect=PIXABAY_DEFAULT_ASPECT):
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host in ("images.unsplash.com", "plus.unsplash.com"):
+        return _replace_query(parts, {"h", "dpr"}, {"w": str(width), "q": "75", "auto": "format", "fit": "max"})
+    if host == "images.pexels.com":
+        return _replace_query(parts, {"h", "dpr", "fit"}, {"auto": "compress", "cs": "tinysrgb", "w": str(width)})
+    if host == "pixabay.com" and PIXABAY_SIZE_SUFFIX.search(parts.path):
+        longest = width * max(aspect, 1.0)
+        size = next((size for size in PIXABAY_SIZES if size >= longest), PIXABAY_SIZES[-1])
+        return urlunsplit(parts._replace(path=PIXABAY_SIZE_SUFFIX.sub(rf"_{size}\2", parts.path)))
+    return url
+
+
+# 이미지 한 장의 정보 (검색 결과가 많아도 가볍도록 __slots__ 사용)
+class ImageResult:
+    __slots__ = (
+        "url", "provider", "provider_id", "description", "width", "height", "photographer", "thumbnail_url", "canonical_url"
+    )
+
+    def __init__(self, url, provider, provider_id=None, description="", width=None, height=None, photographer=None,
+                 thumbnail_url=None):
+        self.url = url
+        self.provider = provider
+        self.provider_id = provider_id
+        self.description = description
+        self.width = width
+        self.height = height
+        self.photographer = photographer
+        # 중복 사진 비교용 작은 썸네일 (잘리지 않은 것)
+        self.thumbnail_url = thumbnail_url
+        self.canonical_url = canonicalize_image_url(url)
+
+    # 중복 판단에 쓰는 키: 정규화한 URL과 (제공자, 제공자 ID)
+    def dedup_keys(self):
+        keys = [self.canonical_url]
+        if self.provider_id is not None:
+            keys.append((self.provider, str(self.provider_id)))
+        return keys
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "canonical_url"}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+# 정규화한 URL/제공자 ID로 O(1) 중복 확인
+class ImageDeduplicator:
+    def __init__(self):
+        self.seen = set()
+
+    # 처음 보는 이미지면 기록하고 True
+    def add(self, result):
+        keys = result.dedup_keys()
+        if any(key in self.seen for key in keys):
+            return False
+        self.seen.update(keys)
+        return True
+
+
+# 1. Unsplash API 요청
+# page: 1부터 시작하는 결과 페이지 번호
+def unsplash_request(keyword, per_page, api_key, orientation, page=1):
+    params = {"query": keyword, "client_id": api_key, "per_page": per_page, "orientation": orientation, "page": page}
+    return "https://api.unsplash.com/search/photos", params, {}
+
+
+# 응답 파싱 함수는 ImageResult 목록을 반환
+def parse_unsplash(data):
+    return [
+        ImageResult(
+            item['urls']['regular'], "Unsplash", item.get('id'),
+            " ".join(filter(None, [item.get('alt_description'), item.get('description')])),
+            item.get('width'), item.get('height'), (item.get('user') or {}).get('name'), item['urls'].get('thumb')
+        )
+        for item in data.get('results', [])
+    ]
+
+
+# 2. Pexels API 요청
+def pexels_request(keyword, per_page, api_key, orientation, page=1):
+    params = {"query": keyword, "per_page": per_page, "orientation": orientation, "page": page}
+    return "https://api.pexels.com/v1/search", params, {"Authorization": api_key}
+
+
+def parse_pexels(data):
+    return [
+        ImageResult(
+            photo['src']['large'], "Pexels", photo.get('id'), photo.get('alt') or "",
+            photo.get('width'), photo.get('height'), photo.get('photographer'), photo['src'].get('small')
+        )
+        for photo in data.get('photos', [])
+    ]
+
+
+# 3. Pixabay API 요청
+def pixabay_request(keyword, per_page, api_key, orientation, page=1):
+    # Pixabay는 portrait/landscape 대신 vertical/horizontal 사용
+    pixabay_orientation = {"portrait": "vertical", "landscape": "horizontal"}.get(orientation, "all")
+    params = {"key": api_key, "q": keyword, "image_type": "photo", "per_page": max(per_page, 3), "orientation": pixabay_orientation,
+              "page": page}
+    return "https://pixabay.com/api/", params, {}
+
+
+def parse_pixabay(data):
+    return [
+        ImageResult(
+            hit['webformatURL'], "Pixabay", hit.get('id'), hit.get('tags') or "",
+            hit.get('imageWidth'), hit.get('imageHeight'), hit.get('user'), hit.get('previewURL')
+        )
+        for hit in data.get('hits', [])
+    ]
+
+
+# 이미지 제공자 (선호 순서대로): (요청 생성 함수, 응답 파싱 함수)
+PROVIDERS = {
+    "Unsplash": (unsplash_request, parse_unsplash),
+    "Pexels": (pexels_request, parse_pexels),
+    "Pixabay": (pixabay_request, parse_pixabay),
+}
+
+
+# 이미지 검색 결과
+class ImageSearchResult:
+    def __init__(self, results, errors, timed_out=None, extras=None, next_pages=None):
+        # ImageResult 목록
+        self.results = results
+        # (제공자, 키워드, 예외) 목록
+        self.errors = errors
+        # 제한 시간 안에 응답하지 않은 제공자 목록
+        self.timed_out = timed_out or []
+        # 받았지만 결과로 고르지 않은 나머지 후보 (순위 순서)
+        self.extras = extras or []
+        # wide 방식에서 응답한 {(제공자, 키워드): 다음에 받을 페이지} - 0이면 더 받을 페이지가 없음
+        self.next_pages = next_pages or {}
+
+    @property
+    def images(self):
+        return [result.url for result in self.results]
+
+    @property
+    def sources(self):
+        return [result.provider for result in self.results]
+
+    def to_dict(self):
+        return {
+            "results": [result.to_dict() for result in self.results],
+            "extras": [result.to_dict() for result in self.extras],
+            "next_pages": [[provider, keyword, page] for (provider, keyword), page in self.next_pages.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            [ImageResult.from_dict(item) for item in data["results"]], [],
+            extras=[ImageResult.from_dict(item) for item in data.get("extras", [])],
+            next_pages={(provider, keyword): page for provider, keyword, page in data.get("next_pages", [])},
+        )
+
+
+# 캐시 형식을 바꾸면 버전을 올려서 이전 항목을 사용하지 않도록 함
+CACHE_FORMAT_VERSION = "v2"
+
+
+# 캐시 키: 정규화한 검색어 + 개수 + 방향 + 제공자 목록 + 검색 방식
+def make_cache_key(query, count, orientation, providers, mode):
+    normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().lower()
+    return f"{CACHE_FORMAT_VERSION}|{normalized}|{count}|{orientation}|{','.join(sorted(providers))}|{mode}"
+
+
+# 결과에 포함된 제공자 중 가장 짧은 TTL 사용
+def get_result_ttl(results, padded):
+    ttls = [PROVIDER_CACHE_TTL[result.provider] for result in results if result.provider in PROVIDER_CACHE_TTL]
+    ttl = min(ttls)
+    if padded:
+        ttl = min(ttl, PARTIAL_RESULT_TTL)
+    return ttl
+
+
+# 결과가 부족한 경우 기본 이미지로 보충
+def pad_with_default_images(results, count):
+    dedup = ImageDeduplicator()
+    for result in results:
+        dedup.add(result)
+
+    shuffled_indices = list(range(len(DEFAULT_IMAGES)))
+    random.shuffle(shuffled_indices)
+
+    for i in shuffled_indices:
+        if len(results) >= count:
+            break
+        result = ImageResult(DEFAULT_IMAGES[i], DEFAULT_SOURCE)
+        if dedup.add(result):
+            results.append(result)
+
+
+# 제공자/키워드 요청을 병렬로 보내고 도착하는 대로 결과를 합치는 검색 엔진
+class ImageSearchEngine:
+    def __init__(self, http, cache, flight, limiter, health, keyword_stats, translator, hasher,
+                 max_workers=MAX_WORKERS):
+        self.http = http
+        self.cache = cache
+        self.flight = flight
+        self.limiter = limiter
+        self.health = health
+        self.keyword_stats = keyword_stats
+        self.translator = translator
+        self.hasher = hasher
+        self.hedged = 0
+        self._lock = threading.Lock()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image-search"
+        )
+        # 검색 전체를 백그라운드로 돌릴 때 사용 (요청용 풀과 분리해서 서로 막히지 않도록)
+        self.jobs = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image-search-job"
+        )
+
+    # 제공자 API 한 번 호출 - 응답 헤더로 할당량을 갱신하고 ImageResult 목록 반환
+    # 성공/실패와 걸린 시간은 제공자 상태에 기록 (할당량 초과는 제공자 장애가 아니므로 제외)
+    def fetch(self, provider, keyword, per_page, api_key, orientation, page=1):
+        build_request, parse = PROVIDERS[provider]
+        url, params, headers = build_request(keyword, per_page, api_key, orientation, page)
+        health = self.health.get(provider)
+        started = time.monotonic()
+        try:
+            response = self.http.get(url, params=params, headers=headers)
+            self.limiter.observe(provider, api_key, response)
+            response.raise_for_status()
+            candidates = parse(response.json())
+        except RateLimitedError:
+            health.cancel_probe()
+            raise
+        except Exception:
+            health.record(False, time.monotonic() - started)
+            raise
+        health.record(True, time.monotonic() - started)
+        return candidates
+
+    # 검색을 백그라운드에서 시작하고 Future를 반환
+    def submit(self, query, count, api_keys, orientation="portrait", deadline_ms=None, mode=None, llm_client=None):
+        return self.jobs.submit(self.search, query, count, api_keys, orientation, deadline_ms, mode, llm_client)
+
+    # llm_client: 용어집/저장된 번역에 없는 한글 검색어를 영어로 번역할 때 사용 (없으면 번역된 것만 사용)
+    # on_progress: 제공자 응답이 도착할 때마다 지금까지의 ImageResult 목록(최대 count개)으로 호출
+    # background: 캐시를 미리 채우는 검색 - 캐시를 건너뛰고 새로 검색하며, 사용자 검색용 예비 할당량은 쓰지 않음
+    def search(self, query, count, api_keys, orientation="portrait", deadline_ms=None, mode=None, llm_client=None,
+               on_progress=None, background=False):
+        # 제한 시간은 번역을 포함한 검색 전체에 적용 - LLM 번역은 제한 시간의 일부만 사용해서
+        # OpenAI가 느려도 이미지 검색 시간이 남도록 함 (기다리는 사용자가 없는 background는 제외)
+        budget = (deadline_ms or SEARCH_DEADLINE_MS) / 1000
+        deadline = time.monotonic() + budget
+        queries = self.search_queries(query, llm_client, None if background else budget * TRANSLATION_BUDGET_SHARE)
+        mode = mode or SEARCH_MODE
+        providers = [provider for provider in PROVIDERS if api_keys.get(provider)]
+        cache_key = make_cache_key(" / ".join(queries), count, orientation, providers, mode)
+
+        if not background:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return ImageSearchResult.from_dict(cached)
+
+        # 같은 검색이 이미 진행 중이면 그 결과를 함께 사용
+        result = self.flight.do(
+            cache_key, lambda: self._search_providers(
+                queries, count, api_keys, orientation, providers, cache_key, deadline, mode, on_progress, background
+            )
+        )
+        return ImageSearchResult(
+            list(result.results), list(result.errors), list(result.timed_out), list(result.extras), dict(result.next_pages)
+        )
+
+    def _cache_key(self, query, count, api_keys, orientation, mode, llm_client):
+        queries = self.search_queries(query, llm_client)
+        providers = [provider for provider in PROVIDERS if api_keys.get(provider)]
+        return make_cache_key(" / ".join(queries), count, orientation, providers, mode or SEARCH_MODE)
+
+    # 캐시에 있는 같은 조건의 검색 결과 (없으면 None, 새로 검색하지 않음)
+    def cached_result(self, query, count, api_keys, orientation="portrait", mode=None, llm_client=None):
+        cached = self.cache.get(self._cache_key(query, count, api_keys, orientation, mode, llm_client))
+        return None if cached is None else ImageSearchResult.from_dict(cached)
+
+    # 같은 조건의 검색 결과가 캐시에서 만료되기까지 남은 시간 (초, 캐시에 없으면 None)
+    def cache_expires_in(self, query, count, api_keys, orientation="portrait", mode=None, llm_client=None):
+        entry = self.cache.peek(self._cache_key(query, count, api_keys, orientation, mode, llm_client))
+        if entry is None:
+            return None
+        created_at, expires_at = entry
+        return float("inf") if expires_at is None else expires_at - time.time()
+
+    # 제공자에 보낼 검색어 목록
+    # 이미지 제공자는 한국어 검색 결과가 적으므로 영어로 번역해서 검색 (실패하면 원래 검색어)
+    # 함께 검색(bilingual) 방식이면 원래 한글 검색어도 동시에 검색해서 결과를 합침
+    # timeout: LLM 번역을 기다릴 수 있는 시간(초, None이면 TRANSLATION_TIMEOUT)
+    def search_queries(self, query, llm_client=None, timeout=None):
+        if QUERY_TRANSLATION and is_hangul(query):
+            translated = self.translator.translate(query, llm_client, timeout)
+            if translated:
+                return [translated, query] if BILINGUAL_SEARCH else [translated]
+        return [query]
+
+    # 검색을 백그라운드에서 진행하면서 (ImageSearchResult, 완료 여부)를 차례로 반환하는 생성기
+    # 제공자 응답이 올 때마다 중간 결과를, 마지막에 기본 이미지까지 채운 최종 결과를 반환
+    def stream(self, query, count, api_keys, orientation="portrait", deadline_ms=None, mode=None, llm_client=None):
+        updates = queue.Queue()
+        future = self.jobs.submit(
+            self.search, query, count, api_keys, orientation, deadline_ms, mode, llm_client, updates.put
+        )
+        shown = None
+        while not (future.done() and updates.empty()):
+            try:
+                partial = updates.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            # 표시할 이미지가 바뀌지 않은 중간 결과는 건너뜀
+            if [result.url for result in partial] != shown:
+                shown = [result.url for result in partial]
+                yield ImageSearchResult(partial, []), False
+        yield future.result(), True
+
+    # wide 방식이나 여러 검색어를 합친 경우 설명이 첫 번째(영어) 검색어와 잘 맞는 이미지부터 사용
+    # 그 밖에는 도착한 순서대로 사용
+    def _rank(self, queries, collected, mode):
+        if mode == "wide" or len(queries) > 1:
+            return rank_candidates(" ".join(queries), collected)
+        return list(collected)
+
+    # 한 제공자(레인)의 요청을 검색어마다 보내고 보낸 Future 목록을 반환
+    # variants 방식은 키워드 변형마다, wide 방식은 가장 효율이 좋은 변형 하나로 최대 페이지 크기만큼 요청
+    # 변형 순서는 이 제공자/언어에서 새 이미지를 많이 가져온 순서이고, 효율이 낮은 변형은 빠짐
+    # 첫 번째 요청만 예비 할당량을 쓸 수 있고(background면 모두 쓸 수 없음), 토큰이 없는 요청은 보내지 않음
+    # 회로가 열린 제공자는 건너뛰고, 시험(half-open) 중이면 요청 하나만 보냄
+    def _launch_lane(self, provider, queries, count, api_key, orientation, mode, futures, background=False):
+        health = self.health.get(provider)
+        allowed = health.admit()
+        if allowed == 0:
+            return []
+
+        planned = []
+        for query in queries:
+            language = get_query_language(query)
+            suffixes = self.keyword_stats.order(provider, language, KEYWORD_SUFFIXES[language])
+            suffixes = suffixes[:1] if mode == "wide" else suffixes[:allowed]
+            planned.extend((query, suffix, keyword) for suffix, keyword in zip(suffixes, build_search_keywords(query, suffixes)))
+        per_page = WIDE_PAGE_SIZE[provider] if mode == "wide" else count + (VISUAL_DEDUP_OVERFETCH if VISUAL_DEDUP else 0)
+
+        launched = []
+        for index, (query, suffix, keyword) in enumerate(planned[:allowed]):
+            if not self.limiter.try_acquire(provider, api_key, essential=index == 0 and not background):
+                if allowed == 1:
+                    health.cancel_probe()
+                break
+            future = self.executor.submit(self.fetch, provider, keyword, per_page, api_key, orientation)
+            futures[future] = (provider, keyword, suffix, query)
+            launched.append(future)
+        return launched
+
+    # 선호 순서대로 제공자를 하나씩 시작하는 예비 요청(hedging) 방식
+    # 앞 레인이 자기 p90 응답 시간 안에 필요한 개수를 채우지 못하거나 모두 실패하면 다음 레인을 시작하고,
+    # 먼저 도착한 결과부터 합친 뒤 개수가 차면 남은 요청은 취소
+    # 검색어가 여러 개(영어 + 한글)면 모든 검색어의 응답을 받은 뒤 하나의 순위로 합침
+    def _search_providers(self, queries, count, api_keys, orientation, providers, cache_key, deadline, mode,
+                          on_progress=None, background=False):
+        collected = []
+        dedup = ImageDeduplicator()
+        errors = []
+        timed_out = []
+        answered = set()
+        next_pages = {}
+        filled_at = None
+
+        # 할당량이 남은 제공자를 먼저, 그 안에서는 건강하고 빠른 제공자 순 (기록이 없으면 PROVIDERS 순서)
+        ranked = self.health.rank(providers)
+        lanes = sorted(ranked, key=lambda provider: not self.limiter.has_headroom(provider, api_keys[provider]))
+
+        futures = {}
+        pending = []
+        hedge_at = None
+
+        # 개수를 채웠고, 아직 응답이 없는 검색어의 요청도 더 이상 진행 중이지 않으면 끝
+        def finished():
+            if len(collected) < count:
+                return False
+            waiting = {futures[future][3] for future in pending} - answered
+            return not waiting
+
+        try:
+            while not finished():
+                now = time.monotonic()
+                # 개수를 채웠으면 남은 검색어는 조금만 더 기다림
+                if len(collected) >= count:
+                    deadline = min(deadline, filled_at + BILINGUAL_WAIT_MS / 1000)
+                if now >= deadline:
+                    # 제한 시간 초과 - 개수를 못 채웠으면 응답이 없는 제공자를 기록하고 받은 이미지까지만 사용
+                    # 이미 보낸 요청은 HTTP 타임아웃 안에서 백그라운드로 끝나고 결과는 버림
+                    if len(collected) < count:
+                        for future in pending:
+                            provider = futures[future][0]
+                            if provider not in timed_out:
+                                timed_out.append(provider)
+                    break
+
+                # 진행 중인 요청이 없거나 예비 요청 시점이 지나면 다음 레인 시작
+                if lanes and len(collected) < count and (not pending or now >= hedge_at):
+                    if pending:
+                        with self._lock:
+                            self.hedged += 1
+                    provider = lanes.pop(0)
+                    pending.extend(self._launch_lane(
+                        provider, queries, count, api_keys[provider], orientation, mode, futures, background
+                    ))
+                    hedge_at = now + (self.health.get(provider).hedge_delay() if HEDGING else 0)
+                    continue
+                if not pending:
+                    break
+
+                wait_until = min(deadline, hedge_at) if lanes and len(collected) < count else deadline
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=max(wait_until - now, 0), return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                # 같은 시점에 끝난 응답은 보낸 순서(선호 순서)대로 합침
+                for future in [future for future in pending if future in done]:
+                    pending.remove(future)
+                    provider, keyword, suffix, query = futures[future]
+                    try:
+                        candidates = future.result()
+                    except Exception as e:
+                        errors.append((provider, keyword, e))
+                        continue
+
+                    answered.add(query)
+                    # 한 페이지를 다 채워 받았으면 "더 보기"는 2페이지부터 이어서 받음
+                    if mode == "wide":
+                        next_pages[(provider, keyword)] = 2 if len(candidates) >= WIDE_PAGE_SIZE[provider] else 0
+                    added = 0
+                    for candidate in candidates:
+                        if dedup.add(candidate):
+                            collected.append(candidate)
+                            added += 1
+                            if len(collected) == count:
+                                filled_at = time.monotonic()
+                    # 변형마다 새로 더한 이미지 비율 기록 (wide 방식은 한 페이지 크기 중 새 이미지 비율)
+                    requested = WIDE_PAGE_SIZE[provider] if mode == "wide" else count
+                    self.keyword_stats.record(provider, get_query_language(query), suffix, added, requested)
+                    if on_progress and added:
+                        on_progress(self._rank(queries, collected, mode)[:count])
+        finally:
+            # 필요한 개수를 채웠으면 아직 시작되지 않은 나머지 요청은 취소하고 할당량을 돌려받음
+            for future, (provider, keyword, suffix, query) in futures.items():
+                if future.cancel():
+                    self.limiter.refund(provider, api_keys[provider])
+                    if self.health.get(provider).state == HALF_OPEN:
+                        self.health.get(provider).cancel_probe()
+            self.keyword_stats.flush()
+
+        collected = self._rank(queries, collected, mode)
+        # 순위대로 고르면서 이미 고른 사진과 거의 같은 사진은 빼고 다음 후보로 채움
+        if VISUAL_DEDUP:
+            results = self.hasher.select_distinct(collected, count, deadline, VISUAL_DEDUP_OVERFETCH)
+        else:
+            results = collected[:count]
+        chosen = {id(result) for result in results}
+        extras = [candidate for candidate in collected if id(candidate) not in chosen][:MAX_EXTRA_RESULTS]
+
+        # 실제 이미지를 하나도 얻지 못한 결과는 캐시하지 않음
+        # 시간 초과로 일부만 받은 결과는 짧게 유지해서 다음 검색에서 다시 시도
+        result = ImageSearchResult(results, errors, timed_out, extras, next_pages)
+        if results:
+            padded = len(results) < count or bool(timed_out)
+            ttl = get_result_ttl(results, padded)
+            pad_with_default_images(results, count)
+            self.cache.set(cache_key, result.to_dict(), ttl)
+        else:
+            pad_with_default_images(results, count)
+
+        return result
+
+    def hedge_stats(self):
+        with self._lock:
+            return {"hedged": self.hedged}
+
+
+# 프로세스 전체에서 공유하는 검색 엔진
+@st.cache_resource
+def get_image_search_engine():
+    return ImageSearchEngine(
+        get_http_client(),
+        DiskCache("image_search", IMAGE_CACHE_MAX_BYTES),
+        get_single_flight("image_search"),
+        ProviderRateLimiter(),
+        ProviderHealthTracker(PROVIDERS),
+        KeywordYieldStats(DiskCache("keyword_yield", KEYWORD_STATS_MAX_BYTES)),
+        get_query_translator(),
+        PerceptualHasher(get_http_client(), DiskCache("image_hash", IMAGE_HASH_MAX_BYTES))
+    )
+
+
+# 서버에 설정된 API 키 (.env에 없으면 기본 API 키)
+# 세션 초기값과 캐시 예열이 같은 키(같은 캐시 키, 같은 할당량)를 쓰도록 둘 다 여기서 가져옴
+def get_default_image_api_keys():
+    return {
+        "Unsplash": os.getenv("UNSPLASH_ACCESS_KEY", "q1VeVvIyw9Y0LS56SrB2yLNWXiSPPFiQdtHe5juBBIk"),
+        "Pexels": os.getenv("PEXELS_API_KEY", "hTqMbvksjh4KQvzmBaQEAOEL19izMvDu5PSZpZTRCmRKNPx45WTwAFPq"),
+        "Pixabay": os.getenv("PIXABAY_API_KEY", "39694943-82b226c530c5db8be85fa7918"),
+    }
+
+
+# 세션에 저장된 API 키 목록
+def get_image_api_keys():
+    return {
+        "Unsplash": st.session_state.get("unsplash_api_key", ""),
+        "Pexels": st.session_state.get("pexels_api_key", ""),
+        "Pixabay": st.session_state.get("pixabay_api_key", ""),
+    }
+
+
+# 검색 오류와 시간 초과를 화면에 표시하고 (이미지, 출처) 목록 반환
+def report_image_search(result):
+    for provider, keyword, e in result.errors:
+        st.error(f"{provider} 검색 오류 ({keyword}): {e}")
+    if result.timed_out:
+        st.warning(f"{', '.join(result.timed_out)} 응답이 늦어 받은 이미지까지만 표시합니다.")
+
+    return result.images, result.sources
+
+
+# 검색어 번역에 사용할 OpenAI 클라이언트 (API 키가 없으면 None)
+def get_translation_client():
+    api_key = st.session_state.get("openai_api_key", "")
+    return get_openai_client(api_key) if api_key else None
+
+
+# 다중 이미지 소스(Unsplash, Pexels, Pixabay)를 사용하는 이미지 검색 함수
+# deadline_ms: 검색 전체 제한 시간 (없으면 IMAGE_SEARCH_DEADLINE_MS), 부족한 이미지는 기본 이미지로 채움
+# mode: "wide" 또는 "variants" (없으면 IMAGE_SEARCH_MODE)
+def search_images_from_multiple_sources(query, count=6, orientation="portrait", deadline_ms=None, mode=None):
+    result = get_image_search_engine().search(
+        query, count, get_image_api_keys(), orientation, deadline_ms, mode, get_translation_client()
+    )
+    return report_image_search(result)
+
+
+# 제공자 응답이 도착하는 대로 (이미지, 출처, 완료 여부)를 반환하는 이미지 검색
+# 마지막 결과(완료 여부 True)에서 검색 오류를 화면에 표시
+def iter_image_search(query, count=6, orientation="portrait", deadline_ms=None, mode=None):
+    engine = get_image_search_engine()
+    updates = engine.stream(query, count, get_image_api_keys(), orientation, deadline_ms, mode, get_translation_client())
+    for result, done in updates:
+        if done:
+            images, sources = report_image_search(result)
+        else:
+            images, sources = result.images, result.sources
+        yield images, sources, done
+
+
+# 다른 작업(LLM 호출 등)과 동시에 진행할 수 있도록 이미지 검색을 백그라운드에서 시작
+# API 키는 세션 상태를 읽을 수 있는 스크립트 스레드에서 미리 가져옴
+def start_image_search(query, count=6, orientation="portrait", deadline_ms=None, mode=None):
+    return get_image_search_engine().submit(
+        query, count, get_image_api_keys(), orientation, deadline_ms, mode, get_translation_client()
+    )
+
+
+# start_image_search로 시작한 검색 결과 받기 (완료될 때까지 대기)
+def finish_image_search(future):
+    return report_image_search(future.result())
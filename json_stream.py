@@ -0,0 +1,83 @@
+import re
+import json
+
+# 아직 닫히지 않은 문자열 값: "키": "값...
+PARTIAL_STRING_MEMBER = re.compile(r'\s*"((?:[^"\\]|\\.)*)"\s*:\s*"((?:[^"\\]|\\.)*\\?)$', re.DOTALL)
+
+
+# 스트리밍으로 도착하는 JSON 객체를 조각 단위로 받아
+# 최상위 필드가 하나씩 완성될 때마다 (키, 값)을 돌려주는 파서
+class IncrementalJSONObjectParser:
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.member_start = None
+        self.started = False
+        self.closed = False
+
+    # 새 텍스트를 추가하고 이번에 완성된 필드 목록을 반환
+    def feed(self, text):
+        self.buffer += text
+        completed = []
+
+        while self.pos < len(self.buffer) and not self.closed:
+            c = self.buffer[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '"':
+                self.in_string = True
+            elif c in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    if c != "{":
+                        raise json.JSONDecodeError("JSON 객체가 아닙니다", self.buffer, self.pos)
+                    self.started = True
+                    self.member_start = self.pos + 1
+            elif c in "}]":
+                if self.depth == 1:
+                    completed.extend(self._parse_member(self.member_start, self.pos))
+                    self.closed = True
+                self.depth -= 1
+            elif c == "," and self.depth == 1:
+                completed.extend(self._parse_member(self.member_start, self.pos))
+                self.member_start = self.pos + 1
+            self.pos += 1
+
+        return completed
+
+    def _parse_member(self, start, end):
+        member = self.buffer[start:end]
+        if not member.strip():
+            return []
+        return list(json.loads("{" + member + "}").items())
+
+    # 작성 중인 최상위 문자열 필드가 있으면 (키, 지금까지의 값)을 반환
+    def partial_string(self):
+        if self.depth != 1 or not self.in_string or self.member_start is None:
+            return None
+
+        match = PARTIAL_STRING_MEMBER.match(self.buffer[self.member_start:self.pos])
+        if not match:
+            return None
+
+        key_raw, value_raw = match.groups()
+        # 끝에 걸린 미완성 이스케이프(\, \uXX)는 잘라내고 해석
+        for cut in range(6):
+            try:
+                return json.loads(f'"{key_raw}"'), json.loads(f'"{value_raw[:len(value_raw) - cut]}"')
+            except json.JSONDecodeError:
+                continue
+        return None
+
+    # 스트림이 끝났을 때 객체가 완전히 닫혔는지 확인
+    def close(self):
+        if not self.closed:
+            raise json.JSONDecodeError("JSON 객체가 완성되지 않았습니다", self.buffer, len(self.buffer))
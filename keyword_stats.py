@@ -0,0 +1,71 @@
+import os
+import random
+import threading
+
+# 키워드 변형 효율 판단 설정
+# 효율 = 요청 한 번에 받은 새 이미지 수 / 요청한 개수 (0 ~ 1)
+PRIOR_YIELD = 0.5  # 기록이 없을 때 가정하는 효율
+PRIOR_WEIGHT = 2.0  # 가정한 효율을 요청 몇 번만큼으로 볼지
+MIN_TRIALS = int(os.getenv("KEYWORD_MIN_TRIALS", "10"))  # 이만큼 요청한 뒤에만 제외 여부 판단
+DROP_YIELD = float(os.getenv("KEYWORD_DROP_YIELD", "0.1"))  # 효율이 이보다 낮으면 요청하지 않음
+MIN_VARIANTS = 2  # 효율과 관계없이 남겨 둘 변형 수
+EXPLORE_RATE = 0.05  # 제외한 변형을 가끔 다시 시도하고, 가끔 다른 변형을 맨 앞에 둬서 기록을 갱신
+DECAY_AFTER = 200  # 요청 수가 이만큼 쌓이면 절반으로 줄여 최근 결과를 더 반영
+
+
+# 제공자/언어별로 키워드 변형(접미사)마다 새 이미지를 얼마나 가져왔는지 기록하고
+# 그 기록으로 변형의 순서를 정하거나 효율이 낮은 변형을 뺌 (DiskCache에 저장해서 재시작 후에도 유지)
+class KeywordYieldStats:
+    def __init__(self, store):
+        self.store = store
+        self.stats = {}
+        self.dirty = set()
+        self._lock = threading.Lock()
+
+    # (제공자, 언어)의 {접미사: [요청 수, 효율 합계]}를 처음 사용할 때 저장소에서 불러옴
+    def _table(self, provider, language):
+        key = (provider, language)
+        if key not in self.stats:
+            self.stats[key] = self.store.get(f"{provider}|{language}") or {}
+        return self.stats[key]
+
+    def record(self, provider, language, suffix, new_images, requested):
+        with self._lock:
+            table = self._table(provider, language)
+            entry = table.setdefault(suffix, [0, 0.0])
+            entry[0] += 1
+            entry[1] += min(new_images / max(requested, 1), 1.0)
+            if entry[0] >= DECAY_AFTER:
+                entry[0] /= 2
+                entry[1] /= 2
+            self.dirty.add((provider, language))
+
+    def _yield(self, entry):
+        requests, total = entry if entry else (0, 0.0)
+        return (total + PRIOR_YIELD * PRIOR_WEIGHT) / (requests + PRIOR_WEIGHT)
+
+    # 효율이 높은 순으로 정렬한 접미사 목록 (같으면 기본 순서 유지)
+    # wide 방식은 맨 앞 변형 하나만 요청하므로, 가끔 다른 변형을 맨 앞에 둬서 나머지 변형도 기록이 쌓이도록 함
+    def order(self, provider, language, suffixes):
+        with self._lock:
+            table = self._table(provider, language)
+            ranked = sorted(suffixes, key=lambda suffix: -self._yield(table.get(suffix)))
+            kept = [
+                suffix for index, suffix in enumerate(ranked)
+                if index < MIN_VARIANTS
+                or (table.get(suffix) or [0])[0] < MIN_TRIALS
+                or self._yield(table.get(suffix)) >= DROP_YIELD
+                or random.random() < EXPLORE_RATE
+            ]
+        if len(kept) > 1 and random.random() < EXPLORE_RATE:
+            lead = random.randrange(1, len(kept))
+            kept.insert(0, kept.pop(lead))
+        return kept
+
+    # 바뀐 기록을 저장소에 기록 (검색이 끝날 때 호출)
+    def flush(self):
+        with self._lock:
+            pending = [(key, {suffix: list(entry) for suffix, entry in self.stats[key].items()}) for key in self.dirty]
+            self.dirty.clear()
+        for (provider, language), table in pending:
+            self.store.set(f"{provider}|{language}", table)
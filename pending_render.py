@@ -0,0 +1,48 @@
+import concurrent.futures
+
+import streamlit as st
+
+# LLM 응답을 대신 기다리는 스레드 수 (세션마다 한 번에 하나씩 사용)
+WAIT_WORKERS = 16
+
+_DONE = object()
+
+
+# 프로세스 전체에서 공유하는 대기용 스레드 풀
+@st.cache_resource
+def get_wait_executor():
+    return concurrent.futures.ThreadPoolExecutor(max_workers=WAIT_WORKERS, thread_name_prefix="pending-render")
+
+
+# pending: {Future: 그리기 함수} - 한 페이지에서 동시에 진행 중인 섹션 (이미지 검색 등)
+# 끝난 섹션은 pending에서 빼고 바로 그림 (그리기 함수는 스크립트 스레드에서 호출되므로 st.* 사용 가능)
+def _render_done(pending, done):
+    for future in [future for future in pending if future in done]:
+        pending.pop(future)()
+
+
+# fn을 다른 스레드에서 실행하고 결과를 반환 - 기다리는 동안 먼저 끝난 섹션은 바로 그림
+# fn은 Streamlit을 호출하지 않아야 함 (세션 상태가 필요하면 미리 읽어서 넘김)
+def run_while_pending(fn, pending):
+    future = get_wait_executor().submit(fn)
+    while not future.done():
+        done, _ = concurrent.futures.wait([future, *pending], return_when=concurrent.futures.FIRST_COMPLETED)
+        _render_done(pending, done)
+    return future.result()
+
+
+# iterable의 값을 다른 스레드에서 하나씩 받아 순서대로 반환 - 다음 값을 기다리는 동안 끝난 섹션은 바로 그림
+def iter_while_pending(iterable, pending):
+    iterator = iter(iterable)
+    while True:
+        value = run_while_pending(lambda: next(iterator, _DONE), pending)
+        if value is _DONE:
+            return
+        yield value
+
+
+# 남은 섹션을 끝나는 순서대로 모두 그림
+def render_pending(pending):
+    while pending:
+        done, _ = concurrent.futures.wait(list(pending), return_when=concurrent.futures.FIRST_COMPLETED)
+        _render_done(pending, done)
@@ -0,0 +1,131 @@
+import os
+import time
+import threading
+from collections import deque
+
+# 상태 판단 설정
+HEALTH_WINDOW = int(os.getenv("PROVIDER_HEALTH_WINDOW", "20"))  # 최근 몇 번의 요청으로 오류율을 계산할지
+ERROR_RATE_THRESHOLD = float(os.getenv("PROVIDER_ERROR_RATE_THRESHOLD", "0.5"))  # 이 이상이면 회로 차단
+MIN_SAMPLES = 5  # 오류율을 판단하기 위한 최소 요청 수
+CONSECUTIVE_FAILURES = 3  # 연속 실패가 이 횟수면 바로 차단
+OPEN_COOLDOWN = float(os.getenv("PROVIDER_OPEN_COOLDOWN", "30"))  # 차단 후 시험 요청까지 대기(초)
+SLOW_LATENCY = float(os.getenv("PROVIDER_SLOW_LATENCY", "2.0"))  # 이보다 느리면 순서를 뒤로
+EWMA_ALPHA = 0.3
+# 예비 요청(hedging) 기준 시간: 최근 응답 시간의 p90, 기록이 부족하면 기본값 (초)
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "0.8"))
+HEDGE_MIN_DELAY = 0.05
+LATENCY_SAMPLES = 50
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# 제공자 하나의 상태: 최근 오류율, 지수 이동 평균 지연 시간, 회로 차단기
+class ProviderHealth:
+    def __init__(self):
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)
+        self.ewma_latency = None
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    # 이번 검색에서 보낼 수 있는 요청 수 (0: 건너뜀, 1: 시험 요청, None: 제한 없음)
+    def admit(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return None
+            if self.state == OPEN and time.monotonic() - self.opened_at >= OPEN_COOLDOWN:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return 1
+            return 0
+
+    def record(self, success, latency):
+        with self._lock:
+            self.outcomes.append(success)
+            if latency is not None:
+                self.latencies.append(latency)
+                if self.ewma_latency is None:
+                    self.ewma_latency = latency
+                else:
+                    self.ewma_latency = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma_latency
+
+            if success:
+                self.consecutive_failures = 0
+                if self.state != CLOSED:
+                    # 시험 요청 성공 - 회로를 닫고 기록을 새로 시작
+                    self.state = CLOSED
+                    self.outcomes.clear()
+                    self.outcomes.append(True)
+            else:
+                self.consecutive_failures += 1
+                if self.state == HALF_OPEN or self._should_open():
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+    # 시험 요청이 보내지기 전에 취소된 경우
+    def cancel_probe(self):
+        with self._lock:
+            self.probe_in_flight = False
+
+    def _should_open(self):
+        if self.consecutive_failures >= CONSECUTIVE_FAILURES:
+            return True
+        return len(self.outcomes) >= MIN_SAMPLES and self._error_rate() >= ERROR_RATE_THRESHOLD
+
+    def _error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    # 최근 응답 시간의 90번째 백분위수
+    def _p90_latency(self):
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * 0.9), len(ordered) - 1)]
+
+    # 이 제공자가 이 시간 안에 응답하지 않으면 다음 제공자에 예비 요청을 보냄
+    def hedge_delay(self):
+        with self._lock:
+            p90 = self._p90_latency()
+        if p90 is None:
+            return HEDGE_DEFAULT_DELAY
+        return max(p90, HEDGE_MIN_DELAY)
+
+    # 오류가 잦거나 느린 제공자
+    def degraded(self):
+        with self._lock:
+            slow = self.ewma_latency is not None and self.ewma_latency > SLOW_LATENCY
+            return slow or self._error_rate() >= ERROR_RATE_THRESHOLD / 2
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "error_rate": self._error_rate(),
+                "ewma_latency": self.ewma_latency,
+                "p90_latency": self._p90_latency(),
+            }
+
+
+# 모든 제공자의 상태를 추적하고 요청 순서를 정함
+class ProviderHealthTracker:
+    def __init__(self, providers):
+        self.providers = {provider: ProviderHealth() for provider in providers}
+
+    def get(self, provider):
+        return self.providers[provider]
+
+    # 오류가 잦거나 느린(평균 지연이 SLOW_LATENCY 초과) 제공자를 뒤로 - 나머지는 기존 선호 순서 유지
+    def rank(self, providers):
+        return sorted(providers, key=lambda provider: self.providers[provider].degraded())
+
+    def stats(self):
+        return {provider: health.snapshot() for provider, health in self.providers.items()}
@@ -0,0 +1,184 @@
+import os
+import math
+import time
+import heapq
+import hashlib
+import threading
+
+import numpy as np
+import streamlit as st
+
+from disk_cache import DiskCache
+from fashion_info import canonicalize_query
+
+# 검색어 빈도 추적 설정
+SKETCH_WIDTH = 2048  # 행마다 카운터 수 (클수록 다른 검색어와 겹쳐 세는 오차가 작음)
+SKETCH_DEPTH = 4  # 해시 행 수 (최대 8)
+TOP_K = int(os.getenv("QUERY_STATS_TOP_K", "50"))  # 페이지마다 기억해 둘 인기 검색어 수
+HALF_LIFE = float(os.getenv("QUERY_STATS_HALF_LIFE", str(3 * 24 * 3600)))  # 이 시간(초)이 지나면 검색 한 번의 무게가 절반
+FLUSH_INTERVAL = int(os.getenv("QUERY_STATS_FLUSH_INTERVAL", "60"))  # 이 간격(초)마다 바뀐 기록을 저장
+RENORMALIZE_AT = 1e6  # 가중치가 이만큼 커지면 모든 카운터를 다시 맞춰서 값이 너무 커지지 않게 함
+QUERY_STATS_MAX_BYTES = 1024 * 1024
+
+
+# 고정된 메모리로 항목별 횟수를 근사하는 count-min sketch (실제보다 작게 세지는 않음)
+# 재시작 후에도 같은 칸을 쓰도록 파이썬 hash() 대신 blake2b 사용
+class CountMinSketch:
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH, counts=None):
+        self.width = width
+        self.depth = depth
+        self.counts = np.zeros((depth, width)) if counts is None else counts
+        self._rows = np.arange(depth)
+
+    def _columns(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=8 * self.depth).digest()
+        return np.array([int.from_bytes(digest[i * 8:(i + 1) * 8], "little") % self.width for i in range(self.depth)])
+
+    # 더한 뒤의 추정 횟수 반환
+    def add(self, item, amount=1.0):
+        columns = self._columns(item)
+        self.counts[self._rows, columns] += amount
+        return float(self.counts[self._rows, columns].min())
+
+    def estimate(self, item):
+        return float(self.counts[self._rows, self._columns(item)].min())
+
+
+# 세 검색 페이지의 검색어 빈도를 시간에 따라 줄어드는 횟수로 추적하는 인기 검색어(heavy hitter) 추적기
+# count-min sketch로 모든 검색어의 횟수를 근사하고, 페이지마다 가장 많은 TOP_K개는 최소 힙으로 유지
+# 시간 감소는 forward decay 방식: 기준 시각 이후 시간이 지날수록 새 검색에 더 큰 가중치를 주고,
+# 읽을 때 현재 가중치로 나눠서 모든 카운터를 매번 줄이지 않음
+class QueryFrequencyTracker:
+    def __init__(self, store, top_k=TOP_K, half_life=HALF_LIFE):
+        self.store = store
+        self.top_k = top_k
+        self.rate = math.log(2) / half_life
+        self.searches = 0
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._load()
+
+    # 검색이 끊겨도 마지막 기록까지 저장되도록 FLUSH_INTERVAL마다 저장하는 스레드 시작 (한 번만)
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="query-stats-flush", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.maybe_flush(force=True)
+
+    # 저장된 기록을 불러옴 (없거나 설정이 바뀌었으면 새로 시작)
+    def _load(self):
+        saved = self.store.get("sketch")
+        counts = np.array(saved["counts"]) if saved else None
+        if counts is None or counts.shape != (SKETCH_DEPTH, SKETCH_WIDTH):
+            saved, counts = None, None
+        self.sketch = CountMinSketch(counts=counts)
+        self.landmark = saved["landmark"] if saved else time.time()
+        # 페이지마다 {검색어: 횟수}와 (횟수, 검색어) 최소 힙
+        self.tops = {page: dict(entries) for page, entries in saved["tops"].items()} if saved else {}
+        self.heaps = {}
+        for page in self.tops:
+            self._rebuild_heap(page)
+
+    def _rebuild_heap(self, page):
+        self.heaps[page] = [(count, query) for query, count in self.tops[page].items()]
+        heapq.heapify(self.heaps[page])
+
+    def _weight(self, now):
+        return math.exp(self.rate * (now - self.landmark))
+
+    # 기준 시각을 지금으로 옮기고 모든 카운터를 현재 가중치로 나눔
+    def _renormalize(self, now):
+        weight = self._weight(now)
+        self.sketch.counts /= weight
+        for page, top in self.tops.items():
+            self.tops[page] = {query: count / weight for query, count in top.items()}
+            self._rebuild_heap(page)
+        self.landmark = now
+
+    # 검색 한 번 기록
+    def record(self, page, query):
+        query = canonicalize_query(query or "")
+        if not query:
+            return
+        now = time.time()
+        with self._lock:
+            if self._weight(now) > RENORMALIZE_AT:
+                self._renormalize(now)
+            estimate = self.sketch.add(f"{page}\t{query}", self._weight(now))
+            self._update_top(page, query, estimate)
+            self.searches += 1
+            self._dirty = True
+        self.maybe_flush()
+
+    # 추정 횟수가 인기 검색어 중 가장 적은 것보다 크면 그 자리를 대신함
+    # 힙에는 오래된 값이 남을 수 있으므로 최솟값을 볼 때 현재 값과 다른 항목은 버림
+    def _update_top(self, page, query, estimate):
+        top = self.tops.setdefault(page, {})
+        heap = self.heaps.setdefault(page, [])
+        if query not in top and len(top) >= self.top_k:
+            while heap[0][0] != top.get(heap[0][1]):
+                heapq.heappop(heap)
+            if estimate <= heap[0][0]:
+                return
+            _, evicted = heapq.heappop(heap)
+            del top[evicted]
+
+        top[query] = estimate
+        heapq.heappush(heap, (estimate, query))
+        if len(heap) > self.top_k * 4:
+            self._rebuild_heap(page)
+
+    # 인기 검색어 [(페이지, 검색어, 시간 감소를 반영한 횟수)] - 많은 순, page를 주면 그 페이지만
+    def top_queries(self, page=None, limit=10):
+        with self._lock:
+            weight = self._weight(time.time())
+            entries = [
+                (entry_page, query, count / weight)
+                for entry_page, top in self.tops.items() if page is None or entry_page == page
+                for query, count in top.items()
+            ]
+        return sorted(entries, key=lambda entry: -entry[2])[:limit]
+
+    # 시간 감소를 반영한 한 검색어의 추정 횟수
+    def estimate(self, page, query):
+        with self._lock:
+            return self.sketch.estimate(f"{page}\t{canonicalize_query(query)}") / self._weight(time.time())
+
+    # 마지막 저장 후 FLUSH_INTERVAL이 지났으면 저장 (force면 바로 저장)
+    def maybe_flush(self, force=False):
+        with self._lock:
+            if not self._dirty or (not force and time.monotonic() - self._flushed_at < FLUSH_INTERVAL):
+                return
+            saved = {
+                "landmark": self.landmark,
+                "counts": self.sketch.counts.tolist(),
+                "tops": {page: [[query, count] for query, count in top.items()] for page, top in self.tops.items()},
+            }
+            self._dirty = False
+            self._flushed_at = time.monotonic()
+        self.store.set("sketch", saved)
+
+    def stats(self):
+        with self._lock:
+            return {"searches": self.searches, "tracked": sum(len(top) for top in self.tops.values())}
+
+
+# 프로세스 전체에서 공유하는 검색어 빈도 추적기
+@st.cache_resource
+def get_query_tracker():
+    tracker = QueryFrequencyTracker(DiskCache("query_stats", QUERY_STATS_MAX_BYTES))
+    tracker.start()
+    return tracker
+
+
+# 새 검색 한 번 기록 (같은 검색어로 다시 그리는 경우는 기록하지 않음)
+def record_search(page, query):
+    get_query_tracker().record(page, query)
@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+
+# 제공자별 기본 할당량: (요청 수, 기간 초) - 응답 헤더를 받으면 실제 값으로 갱신
+DEFAULT_QUOTAS = {
+    "Unsplash": (int(os.getenv("UNSPLASH_RATE_LIMIT", "50")), 3600),
+    "Pexels": (int(os.getenv("PEXELS_RATE_LIMIT", "200")), 3600),
+    "Pixabay": (int(os.getenv("PIXABAY_RATE_LIMIT", "100")), 60),
+}
+
+# X-Ratelimit-Limit 헤더가 기본 할당량과 같은 기간의 한도인 제공자 (Unsplash는 시간당, Pixabay는 분당)
+# Pexels의 한도는 월 단위라 용량으로 쓰지 않음
+HEADER_LIMIT_PROVIDERS = {"Unsplash", "Pixabay"}
+
+# 이 비율만큼은 검색마다 꼭 필요한 첫 요청을 위해 남겨 둠
+RESERVE_RATIO = float(os.getenv("RATE_LIMIT_RESERVE_RATIO", "0.2"))
+
+
+# 할당량을 다 썼을 때
+class RateLimitedError(Exception):
+    pass
+
+
+# 기간 동안 capacity만큼 요청할 수 있는 토큰 버킷
+class TokenBucket:
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / self.period)
+        self.updated_at = now
+
+    # reserve보다 많이 남아 있을 때만 토큰 하나 사용
+    def try_acquire(self, reserve=0.0):
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return False
+            self._refill(now)
+            if self.tokens - 1 < reserve:
+                return False
+            self.tokens -= 1
+            return True
+
+    # 응답 헤더의 남은 요청 수로 보정 (서버 값이 더 정확하므로 더 적은 쪽을 사용)
+    # limit을 주면 용량을 서버의 한도로 바꾸고 남은 요청 수를 그대로 사용 (데모 키와 운영 키의 한도가 다름)
+    def update(self, remaining=None, reset_in=None, limit=None):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit is not None and limit > 0 and limit != self.capacity:
+                self.capacity = limit
+                self.tokens = min(limit, float(remaining)) if remaining is not None else min(self.tokens, limit)
+            elif remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if remaining <= 0 and reset_in:
+                    self.blocked_until = now + reset_in
+
+    # 보내지 않고 취소된 요청의 토큰 돌려주기
+    def refund(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    # 429를 받으면 초기화될 때까지 보내지 않음
+    def block(self, seconds):
+        with self._lock:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def available(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return 0.0 if now < self.blocked_until else self.tokens
+
+
+def _header_number(headers, name):
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# (제공자, API 키)마다 토큰 버킷을 두고 응답 헤더(X-Ratelimit-*)로 갱신하는 스케줄러
+# 할당량은 키마다 따로 있으므로 사용자가 입력한 키와 서버 키가 서로의 요청을 막지 않음
+class ProviderRateLimiter:
+    def __init__(self, quotas=DEFAULT_QUOTAS, reserve_ratio=RESERVE_RATIO):
+        self.quotas = quotas
+        self.reserve_ratio = reserve_ratio
+        self.buckets = {}
+        self.shed = {provider: 0 for provider in quotas}
+        self._lock = threading.Lock()
+
+    # 처음 쓰는 키는 기본 할당량으로 시작
+    def _bucket(self, provider, api_key):
+        if provider not in self.quotas:
+            return None
+        with self._lock:
+            bucket = self.buckets.get((provider, api_key))
+            if bucket is None:
+                bucket = self.buckets[(provider, api_key)] = TokenBucket(*self.quotas[provider])
+            return bucket
+
+    # essential이 아닌 요청(추가 키워드 변형 등)은 예비분을 남겨 두고 보냄
+    # 토큰이 없으면 False를 반환하고, 해당 요청은 보내지 않음
+    def try_acquire(self, provider, api_key, essential=True):
+        bucket = self._bucket(provider, api_key)
+        if bucket is None:
+            return True
+        reserve = 0.0 if essential else bucket.capacity * self.reserve_ratio
+        if bucket.try_acquire(reserve):
+            return True
+        with self._lock:
+            self.shed[provider] += 1
+        return False
+
+    def refund(self, provider, api_key):
+        bucket = self._bucket(provider, api_key)
+        if bucket is not None:
+            bucket.refund()
+
+    # 지금 바로 보낼 수 있는 토큰이 남아 있는지
+    def has_headroom(self, provider, api_key):
+        bucket = self._bucket(provider, api_key)
+        return bucket is None or bucket.available() >= 1
+
+    def observe(self, provider, api_key, response):
+        bucket = self._bucket(provider, api_key)
+        if bucket is None:
+            return
+
+        headers = response.headers
+        remaining = _header_number(headers, "X-Ratelimit-Remaining")
+        limit = _header_number(headers, "X-Ratelimit-Limit") if provider in HEADER_LIMIT_PROVIDERS else None
+        reset = _header_number(headers, "X-Ratelimit-Reset")
+        # Pexels는 초기화 시각(UNIX 시간), Pixabay는 남은 초를 보냄
+        reset_in = None
+        if reset is not None:
+            reset_in = max(reset - time.time(), 0.0) if reset > 1e9 else reset
+
+        if response.status_code == 429:
+            retry_after = _header_number(headers, "Retry-After")
+            bucket.block(retry_after or reset_in or bucket.period)
+            raise RateLimitedError(f"{provider} 요청 한도를 초과했습니다.")
+
+        bucket.update(remaining, reset_in, limit)
+
+    # 제공자마다 사용 중인 모든 키의 합계
+    def stats(self):
+        with self._lock:
+            shed = dict(self.shed)
+            buckets = list(self.buckets.items())
+        stats = {provider: {"available": 0, "capacity": 0, "shed": shed[provider], "keys": 0} for provider in self.quotas}
+        for (provider, _), bucket in buckets:
+            stats[provider]["available"] += int(bucket.available())
+            stats[provider]["capacity"] += int(bucket.capacity)
+            stats[provider]["keys"] += 1
+        return stats
@@ -0,0 +1,20 @@
+import streamlit as st
+
+# 세션마다 기억해 둘 최근 검색 결과 수
+MAX_MEMO_ENTRIES = 20
+
+
+# 위젯 조작이나 st.rerun()으로 스크립트가 다시 실행될 때
+# 같은 페이지 + 같은 검색어면 외부 API를 다시 부르지 않고 이 결과로 다시 그림
+def get_search_memo(page, query):
+    return st.session_state.get("search_memo", {}).get((page, query))
+
+
+def set_search_memo(page, query, result):
+    memo = st.session_state.setdefault("search_memo", {})
+    memo.pop((page, query), None)
+    memo[(page, query)] = result
+
+    # 오래된 결과부터 정리
+    while len(memo) > MAX_MEMO_ENTRIES:
+        memo.pop(next(iter(memo)))
@@ -0,0 +1,138 @@
+import threading
+import concurrent.futures
+
+import streamlit as st
+
+
+# 진행 중인 호출 하나
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# 스트리밍 응답을 여러 구독자에게 나눠 주는 버퍼
+# 늦게 합류한 구독자도 처음 조각부터 다시 받음
+class _Broadcast:
+    def __init__(self):
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def run(self, make_stream):
+        try:
+            for chunk in make_stream():
+                with self.cond:
+                    self.chunks.append(chunk)
+                    self.cond.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self.cond:
+                self.finished = True
+                self.cond.notify_all()
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self.cond:
+                while index >= len(self.chunks) and not self.finished:
+                    self.cond.wait()
+                if index < len(self.chunks):
+                    chunk = self.chunks[index]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            index += 1
+            yield chunk
+
+
+# 같은 키로 동시에 들어온 요청은 진행 중인 호출 하나를 기다렸다가 결과를 공유
+class SingleFlight:
+    def __init__(self, max_stream_workers=16):
+        self.calls = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_stream_workers, thread_name_prefix="singleflight-stream"
+        )
+
+    # timeout: 다른 세션의 호출을 기다릴 최대 시간(초) - 넘으면 TimeoutError (직접 호출할 때는 적용 안 됨)
+    def do(self, key, fn, timeout=None):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    call = _Call()
+                    self._calls[key] = call
+                    self.calls += 1
+                    leader = True
+                else:
+                    self.coalesced += 1
+                    leader = False
+
+            if leader:
+                try:
+                    call.result = fn()
+                    return call.result
+                except BaseException as e:
+                    call.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"{key} 호출을 기다리는 시간이 초과되었습니다.")
+            # 먼저 시작한 세션이 중단(재실행 등)된 경우에는 직접 다시 시도
+            if call.error is not None and not isinstance(call.error, Exception):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    # 스트리밍 호출 공유: 생산은 백그라운드 스레드에서 한 번만 하고, 조각을 순서대로 돌려주는 반복자를 반환
+    # on_complete는 스트림이 오류 없이 끝나면 전체 조각 목록으로 한 번 호출 (캐시 저장 등)
+    def stream(self, key, make_stream, on_complete=None):
+        with self._lock:
+            broadcast = self._streams.get(key)
+            if broadcast is not None:
+                self.coalesced += 1
+            else:
+                broadcast = _Broadcast()
+                self._streams[key] = broadcast
+                self.calls += 1
+                self._executor.submit(self._produce, key, broadcast, make_stream, on_complete)
+        return iter(broadcast)
+
+    def _produce(self, key, broadcast, make_stream, on_complete):
+        try:
+            broadcast.run(make_stream)
+            if on_complete and broadcast.error is None:
+                on_complete(broadcast.chunks)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._streams),
+            }
+
+
+# 프로세스 전체에서 공유하는 single-flight (용도별로 하나씩)
+@st.cache_resource
+def get_single_flight(name):
+    return SingleFlight()
@@ -0,0 +1,200 @@
+import os
+import threading
+
+import streamlit as st
+
+from disk_cache import DiskCache
+from singleflight import get_single_flight
+from fashion_info import OPENAI_MODEL, canonicalize_query
+
+# 프롬프트를 바꾸면 버전을 올려서 이전 번역을 사용하지 않도록 함
+TRANSLATION_PROMPT_VERSION = "translate-v1"
+
+# 한글 검색어를 영어로 바꿔 이미지 제공자에 보낼지 여부
+QUERY_TRANSLATION = os.getenv("IMAGE_QUERY_TRANSLATION", "1") == "1"
+TRANSLATION_TIMEOUT = float(os.getenv("TRANSLATION_TIMEOUT", "5"))
+# 번역에 실패한 검색어는 이 시간(초) 동안 LLM을 다시 부르지 않고 원래 검색어로 검색
+TRANSLATION_FAILURE_TTL = int(os.getenv("TRANSLATION_FAILURE_TTL", "300"))
+TRANSLATION_CACHE_MAX_BYTES = 2 * 1024 * 1024
+
+# 자주 쓰는 패션 용어 (LLM 호출 없이 바로 번역)
+FASHION_GLOSSARY = {
+    "패션": "fashion",
+    "스타일": "style",
+    "스타일링": "styling",
+    "코디": "outfit",
+    "룩": "look",
+    "트렌드": "trend",
+    "미니멀": "minimal",
+    "미니멀리즘": "minimalism",
+    "오버핏": "oversized",
+    "스트릿": "streetwear",
+    "스트리트": "street",
+    "빈티지": "vintage",
+    "레트로": "retro",
+    "캐주얼": "casual",
+    "포멀": "formal",
+    "클래식": "classic",
+    "보헤미안": "bohemian",
+    "놈코어": "normcore",
+    "고프코어": "gorpcore",
+    "아메카지": "amekaji",
+    "프레피": "preppy",
+    "올드머니": "old money",
+    "와이투케이": "y2k",
+    "애슬레저": "athleisure",
+    "시티보이": "city boy",
+    "원피스": "dress",
+    "드레스": "dress",
+    "블라우스": "blouse",
+    "셔츠": "shirt",
+    "티셔츠": "t-shirt",
+    "니트": "knit",
+    "가디건": "cardigan",
+    "카디건": "cardigan",
+    "후드티": "hoodie",
+    "맨투맨": "sweatshirt",
+    "자켓": "jacket",
+    "재킷": "jacket",
+    "코트": "coat",
+    "트렌치코트": "trench coat",
+    "패딩": "puffer jacket",
+    "블레이저": "blazer",
+    "청바지": "jeans",
+    "데님": "denim",
+    "슬랙스": "slacks",
+    "스커트": "skirt",
+    "치마": "skirt",
+    "바지": "pants",
+    "운동화": "sneakers",
+    "스니커즈": "sneakers",
+    "부츠": "boots",
+    "로퍼": "loafers",
+    "가방": "bag",
+    "모자": "hat",
+    "여름": "summer",
+    "겨울": "winter",
+    "봄": "spring",
+    "가을": "autumn",
+    "여성": "women",
+    "남성": "men",
+    "데일리": "daily",
+    "오피스": "office",
+    "하객": "wedding guest",
+}
+
+
+# 한글 포함 여부 확인
+def is_hangul(text):
+    return any('\u3131' <= c <= '\u318F' or '\uAC00' <= c <= '\uD7A3' for c in text)
+
+
+# 용어집으로 번역 - 통째로 있거나 모든 한글 단어가 용어집에 있을 때만, 아니면 None
+def lookup_glossary(query):
+    normalized = canonicalize_query(query)
+    if normalized in FASHION_GLOSSARY:
+        return FASHION_GLOSSARY[normalized]
+
+    words = []
+    for word in normalized.split(" "):
+        if is_hangul(word):
+            if word not in FASHION_GLOSSARY:
+                return None
+            word = FASHION_GLOSSARY[word]
+        words.append(word)
+    return " ".join(words)
+
+
+# 번역 프롬프트 (바꾸면 TRANSLATION_PROMPT_VERSION도 올릴 것)
+def build_translation_messages(query):
+    return [
+        {"role": "system", "content": "You translate Korean fashion search queries into short English image-search queries. Keep brand names in their usual English spelling. Reply with the English query only."},
+        {"role": "user", "content": query}
+    ]
+
+
+# LLM으로 검색어 번역 - 결과가 비었거나 여전히 한글이면 None
+# timeout: 이 호출에 쓸 수 있는 시간(초), TRANSLATION_TIMEOUT보다 길게는 기다리지 않음
+def fetch_query_translation(client, query, timeout=None):
+    timeout = TRANSLATION_TIMEOUT if timeout is None else min(TRANSLATION_TIMEOUT, timeout)
+    response = client.with_options(timeout=timeout, max_retries=0).chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=build_translation_messages(query),
+        temperature=0,
+        max_tokens=30
+    )
+    content = (response.choices[0].message.content or "").strip().strip("\"'").strip()
+    if not content or is_hangul(content):
+        return None
+    return content
+
+
+# 한국어 -> 영어 검색어 번역: 용어집, 저장된 번역, LLM 순서로 시도
+# LLM 번역은 DiskCache에 저장해서 재시작 후에도 다시 호출하지 않음
+# 실패도 빈 문자열로 잠시 저장해서 OpenAI가 느리거나 멈췄을 때 검색마다 기다리지 않도록 함
+class QueryTranslator:
+    def __init__(self, store, flight):
+        self.store = store
+        self.flight = flight
+        self.glossary_hits = 0
+        self.cache_hits = 0
+        self.llm_calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # 영어 검색어를 반환하고, 번역할 수 없으면 None (한글이 없으면 그대로 반환)
+    # client가 None이면 LLM은 사용하지 않음, timeout은 LLM 호출에 쓸 수 있는 시간(초)
+    def translate(self, query, client=None, timeout=None):
+        if not is_hangul(query):
+            return query
+
+        translated = lookup_glossary(query)
+        if translated:
+            self._count("glossary_hits")
+            return translated
+
+        key = f"ko-en|{OPENAI_MODEL}|{TRANSLATION_PROMPT_VERSION}|{canonicalize_query(query)}"
+        translated = self.store.get(key)
+        if translated is not None:
+            # 빈 문자열은 최근에 번역에 실패한 검색어
+            if translated:
+                self._count("cache_hits")
+            return translated or None
+        if client is None or (timeout is not None and timeout <= 0):
+            return None
+
+        def fetch_and_store():
+            self._count("llm_calls")
+            try:
+                translated = fetch_query_translation(client, query, timeout)
+            except Exception:
+                self.store.set(key, "", TRANSLATION_FAILURE_TTL)
+                raise
+            self.store.set(key, translated or "", None if translated else TRANSLATION_FAILURE_TTL)
+            return translated
+
+        try:
+            return self.flight.do(key, fetch_and_store, timeout)
+        except Exception:
+            # 번역에 실패하면 원래 검색어로 검색
+            self._count("failures")
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "glossary_hits": self.glossary_hits,
+                "cache_hits": self.cache_hits,
+                "llm_calls": self.llm_calls,
+                "failures": self.failures,
+            }
+
+
+# 프로세스 전체에서 공유하는 번역기
+@st.cache_resource
+def get_query_translator():
+    return QueryTranslator(DiskCache("translation", TRANSLATION_CACHE_MAX_BYTES), get_single_flight("translation"))